@@ -1,7 +1,58 @@
 from flask import jsonify, request
-from database import supabase_client
+from postgrest import APIError
+from database import supabase_client, fetch_all_rows
+from reference_cache import get_reference
 from datetime import datetime
 
+def get_program_counts(academic_year):
+    """
+    Return {program_id: {"total_courses", "actual_sections"}} for one academic year.
+    Uses the academic_year_program_counts database function; if it has not been created yet
+    (migrations/create_academic_year_program_counts_function.sql), counts the year's sections in Python instead.
+    Any other database error is raised.
+    """
+    try:
+        rows = supabase_client.rpc("academic_year_program_counts", {"p_academic_year": academic_year}).execute().data or []
+        return {
+            row["program_id"]: {"total_courses": row["total_courses"], "actual_sections": row["actual_sections"]}
+            for row in rows
+        }
+    except APIError as e:
+        # PGRST202: PostgREST found no such function, i.e. the migration has not been applied
+        if e.code != "PGRST202":
+            raise
+        print(f"academic_year_program_counts unavailable, counting in Python: {e}")
+
+    courses = get_reference("courses", "all", lambda: supabase_client.table("courses").select("*").execute().data or [])
+    schedule_ids = [
+        row["id"] for row in fetch_all_rows(
+            lambda: supabase_client.table("schedules").select("id").eq("academic_year", academic_year).order("id")
+        )
+    ]
+    sections = []
+    if schedule_ids:
+        # paged: PostgREST cuts the response off at max-rows without an error
+        sections = fetch_all_rows(
+            lambda: supabase_client.table("sections").select("id, course_id").in_("schedule_id", schedule_ids).order("id")
+        )
+
+    # Count sections by course_id
+    sections_by_course = {}
+    for section in sections:
+        course_id = section.get("course_id")
+        if course_id:
+            sections_by_course[course_id] = sections_by_course.get(course_id, 0) + 1
+
+    counts = {}
+    for course in courses:
+        program_id = course.get("program_id")
+        if program_id:
+            entry = counts.setdefault(program_id, {"total_courses": 0, "actual_sections": 0})
+            entry["total_courses"] += 1
+            entry["actual_sections"] += sections_by_course.get(course["course_id"], 0)
+    return counts
+
+
 def register_data_routes(app):
     
     @app.route("/api/courses", methods=["GET"])
@@ -11,12 +62,9 @@ def register_data_routes(app):
         Returns course data needed for the NewSchedule page.
         """
         try:
-            response = supabase_client.table("courses").select("*").execute()
-            
-            if not response.data:
-                return jsonify([]), 200
-            
-            return jsonify(response.data), 200
+            courses = get_reference("courses", "all", lambda: supabase_client.table("courses").select("*").execute().data or [])
+
+            return jsonify(courses), 200
             
         except Exception as e:
             return jsonify({"error": str(e)}), 500
@@ -34,83 +82,67 @@ def register_data_routes(app):
                 academic_year = datetime.now().year
             
             # Fetch all programs
-            programs_response = supabase_client.table("programs").select("*").execute()
-            programs = programs_response.data or []
+            programs = get_reference("programs", "all", lambda: supabase_client.table("programs").select("*").execute().data or [])
             
             if not programs:
                 return jsonify([]), 200
             
-            # Fetch all courses
-            courses_response = supabase_client.table("courses").select("course_id, program_id").execute()
-            courses = courses_response.data or []
-            
-            # Group courses by program_id
-            courses_by_program = {}
-            for course in courses:
-                program_id = course.get("program_id")
-                if program_id:
-                    if program_id not in courses_by_program:
-                        courses_by_program[program_id] = []
-                    courses_by_program[program_id].append(course)
-            
-            # Fetch all sections to count assignments
-            sections_response = supabase_client.table("sections").select("course_id").execute()
-            sections = sections_response.data or []
-            
-            # Count sections by course_id
-            sections_by_course = {}
-            for section in sections:
-                course_id = section.get("course_id")
-                if course_id:
-                    sections_by_course[course_id] = sections_by_course.get(course_id, 0) + 1
-            
+            # Course and section counts per program for this academic year, aggregated in the database
+            counts_by_program = get_program_counts(academic_year)
+
+            # Resolve every program's academic chairs in one users query
+            chair_uuids_by_program = {}
+            for program in programs:
+                academic_chair_field = program.get("academic_chair") or ""
+                chair_uuids_by_program[program.get("program_id")] = [
+                    uuid_str.strip() for uuid_str in academic_chair_field.split(",") if uuid_str.strip()
+                ]
+
+            all_chair_uuids = sorted({u for uuids in chair_uuids_by_program.values() for u in uuids})
+            chair_names_by_id = {}
+            if all_chair_uuids:
+                try:
+                    # Note: Using filter with 'in' instead of in_() method
+                    users_response = supabase_client.table("users") \
+                        .select("id, first_name, last_name") \
+                        .filter("id", "in", f"({','.join(all_chair_uuids)})") \
+                        .execute()
+
+                    for user in (users_response.data or []):
+                        full_name = f"{user.get('first_name', '')} {user.get('last_name', '')}".strip()
+                        if full_name:
+                            chair_names_by_id[user["id"]] = full_name
+                except Exception as user_error:
+                    print(f"Error fetching academic chairs: {user_error}")
+                    # Continue without chair names if there's an error
+
             # Build summary for each program
             summary_data = []
             
             for program in programs:
                 program_id = program.get("program_id")
-                program_courses = courses_by_program.get(program_id, [])
-                
+                counts = counts_by_program.get(program_id, {})
+
                 # Calculate total courses
-                total_courses = len(program_courses)
-                
+                total_courses = counts.get("total_courses", 0)
+
                 # Calculate expected sections (6 per course)
                 expected_sections = total_courses * 6
-                
-                # Calculate actual assigned sections
-                actual_sections = 0
-                for course in program_courses:
-                    course_id = course.get("course_id")
-                    actual_sections += sections_by_course.get(course_id, 0)
-                
+
+                # Sections created for this program's courses in the academic year
+                actual_sections = counts.get("actual_sections", 0)
+
                 # Calculate progress percentage
                 progress_percentage = 0
                 if expected_sections > 0:
                     progress_percentage = round((actual_sections / expected_sections) * 100, 1)
-                
-                # Parse academic chair UUIDs and fetch names
-                academic_chair_field = program.get("academic_chair") or ""
-                chair_uuids = [uuid_str.strip() for uuid_str in academic_chair_field.split(",") if uuid_str.strip()]
-                
-                chair_names = []
-                if chair_uuids:
-                    try:
-                        # Fetch user names for these UUIDs
-                        # Note: Using filter with 'in' instead of in_() method
-                        users_response = supabase_client.table("users") \
-                            .select("id, first_name, last_name") \
-                            .filter("id", "in", f"({','.join(chair_uuids)})") \
-                            .execute()
-                        
-                        for user in (users_response.data or []):
-                            full_name = f"{user.get('first_name', '')} {user.get('last_name', '')}".strip()
-                            if full_name:
-                                chair_names.append(full_name)
-                    except Exception as user_error:
-                        print(f"Error fetching users for program {program_id}: {user_error}")
-                        # Continue without chair names if there's an error
-                        pass
-                
+
+                chair_names = [
+                    chair_names_by_id[uuid_str]
+                    for uuid_str in chair_uuids_by_program.get(program_id, [])
+                    if uuid_str in chair_names_by_id
+                ]
+
                 summary_data.append({
                     "program_id": program_id,
                     "acronym": program.get("acronym", ""),
@@ -142,12 +174,9 @@ def register_data_routes(app):
         Returns instructor data needed for the NewSchedule page.
         """
         try:
-            response = supabase_client.table("instructors").select("*").execute()
-            
-            if not response.data:
-                return jsonify([]), 200
-            
-            return jsonify(response.data), 200
+            instructors = get_reference("instructors", "all", lambda: supabase_client.table("instructors").select("*").execute().data or [])
+
+            return jsonify(instructors), 200
             
         except Exception as e:
             return jsonify({"error": str(e)}), 500
@@ -1,9 +1,27 @@
 import json
+import re
 from datetime import time, timedelta
-from flask import jsonify, request
+from flask import Response, jsonify, request, stream_with_context
 from postgrest import APIError
-from database import supabase_client
-from artifacts.schedulingprototype.scheduling import solver_main
+from database import supabase_client, fetch_all_rows
+from reference_cache import get_reference, invalidate_reference
+from artifacts.schedulingprototype.scheduling import (
+    repair_main,
+    evaluate_scenarios,
+    apply_scenario,
+    build_solve_profile,
+    build_hours_policy,
+    DEFAULT_HOURS_POLICY,
+)
+from artifacts.schedulingprototype.solver_jobs import (
+    submit_auto_assign,
+    submit_year_auto_assign,
+    run_auto_assign,
+    get_job_status,
+    accept_incumbent,
+    iter_job_events,
+    JobConflict,
+)
 
 def register_schedule_routes(app):
 
@@ -35,81 +53,97 @@ def register_schedule_routes(app):
         try:
             # -------------------------------
             # UPSERT SCHEDULED COURSES + SYNC SECTIONS
+            # Existing rows are loaded once and diffed in memory, so the number of
+            # requests stays the same however many courses the schedule has
             # -------------------------------
-            def sync_sections_for_scheduled_course(sc_row):
-                scheduled_course_id = sc_row["scheduled_course_id"]
-                course_id = sc_row["course_id"]
-                term = sc_row["term"]
-                num_sections = sc_row["num_sections"]
+            existing_courses = (
+                supabase_client.table("scheduled_courses")
+                .select("scheduled_course_id,num_sections,term,schedule_id,course_id,delivery_mode")
+                .eq("schedule_id", schedule_id)
+                .execute()
+            ).data or []
+            existing_sections = (
+                supabase_client.table("sections")
+                .select("id,schedule_id,course_id,term,section_letter,scheduled_course_id")
+                .eq("schedule_id", schedule_id)
+                .execute()
+            ).data or []
+            print(f"Loaded {len(existing_courses)} scheduled courses and {len(existing_sections)} sections for schedule {schedule_id}")
 
-                existing_resp = (
-                    supabase_client.table("sections")
-                    .select("id,section_letter")
-                    .eq("scheduled_course_id", scheduled_course_id)
-                    .order("section_letter", desc=False)
-                    .execute()
-                )
-                existing_sections = existing_resp.data or []
-                existing_letters = [s["section_letter"] for s in existing_sections]
+            courses_by_key = {(sc["course_id"], sc["term"]): sc for sc in existing_courses}
 
-                # DELETE extra sections
-                for s in existing_sections:
-                    if s["section_letter"] not in [chr(ord("A")+i) for i in range(num_sections)]:
-                        supabase_client.table("sections").delete().eq("id", s["id"]).execute()
+            # (course_id, term) -> requested course; a course listed twice in a term keeps its last entry
+            requested = {}
+            for semester, courses in added_courses_by_semester.items():
+                for course in courses:
+                    requested[(course["course_id"], semester)] = course
+
+            course_upserts = []
+            for (course_id, semester), course in requested.items():
+                num_sections = int(course.get("num_sections", 1))
+                current = courses_by_key.get((course_id, semester))
+                if current and current["num_sections"] == num_sections:
+                    continue
+                course_upserts.append({
+                    "schedule_id": schedule_id,
+                    "course_id": course_id,
+                    "term": semester,
+                    "num_sections": num_sections,
+                    "status": "sections_created",
+                    "delivery_mode": current["delivery_mode"] if current else course.get("delivery_mode"),
+                })
+
+            if course_upserts:
+                upserted = supabase_client.table("scheduled_courses").upsert(
+                    course_upserts, on_conflict="schedule_id,course_id,term"
+                ).execute().data or []
+                for sc in upserted:
+                    courses_by_key[(sc["course_id"], sc["term"])] = sc
+            print(f"Upserted {len(course_upserts)} scheduled course(s)")
+
+            scheduled_courses_by_id = {
+                courses_by_key[key]["scheduled_course_id"]: courses_by_key[key]
+                for key in requested if key in courses_by_key
+            }
 
-                # INSERT missing sections
-                for i in range(num_sections):
-                    letter = chr(ord("A")+i)
+            # Diff each requested course's sections against letters A.. up to num_sections
+            sections_by_course = {}
+            for s in existing_sections:
+                sections_by_course.setdefault(s["scheduled_course_id"], []).append(s)
+
+            stale_section_ids = []
+            section_inserts = []
+            for scheduled_course_id, sc_row in scheduled_courses_by_id.items():
+                wanted_letters = [chr(ord("A") + i) for i in range(int(sc_row["num_sections"]))]
+                existing_letters = set()
+                for s in sections_by_course.get(scheduled_course_id, []):
+                    if s["section_letter"] in wanted_letters:
+                        existing_letters.add(s["section_letter"])
+                    else:
+                        stale_section_ids.append(s["id"])
+
+                for letter in wanted_letters:
                     if letter not in existing_letters:
-                        supabase_client.table("sections").insert({
-                            "schedule_id": sc_row["schedule_id"],
-                            "course_id": course_id,
-                            "term": term,
+                        section_inserts.append({
+                            "schedule_id": schedule_id,
+                            "course_id": sc_row["course_id"],
+                            "term": sc_row["term"],
                             "section_letter": letter,
                             "delivery_mode": sc_row.get("delivery_mode") or "both",
                             "timeslots": [],
                             "scheduled_course_id": scheduled_course_id
-                        }).execute()
-
-            scheduled_courses_batch = []
+                        })
 
-            for semester, courses in added_courses_by_semester.items():
-                for course in courses:
-                    course_id = course["course_id"]
-                    num_sections = int(course.get("num_sections", 1))
-
-                    # Check existing scheduled_course
-                    existing_resp = (
-                        supabase_client.table("scheduled_courses")
-                        .select("scheduled_course_id,num_sections,term,schedule_id,course_id,delivery_mode")
-                        .eq("schedule_id", schedule_id)
-                        .eq("course_id", course_id)
-                        .eq("term", semester)
-                        .execute()
-                    )
-                    rows = existing_resp.data or []
-
-                    if rows:
-                        sc_row = rows[0]
-                        if sc_row["num_sections"] != num_sections:
-                            supabase_client.table("scheduled_courses").update({
-                                "num_sections": num_sections,
-                                "status": "sections_created"
-                            }).eq("scheduled_course_id", sc_row["scheduled_course_id"]).execute()
-                            sc_row["num_sections"] = num_sections
-                    else:
-                        insert_resp = supabase_client.table("scheduled_courses").insert({
-                            "schedule_id": schedule_id,
-                            "course_id": course_id,
-                            "num_sections": num_sections,
-                            "term": semester,
-                            "status": "sections_created",
-                            "delivery_mode": course.get("delivery_mode")
-                        }).execute()
-                        sc_row = insert_resp.data[0]
+            if stale_section_ids:
+                supabase_client.table("sections").delete().in_("id", stale_section_ids).execute()
+            print(f"Deleted {len(stale_section_ids)} extra section(s)")
 
-                    scheduled_courses_batch.append(sc_row)
-                    sync_sections_for_scheduled_course(sc_row)
+            inserted_sections = []
+            if section_inserts:
+                inserted_sections = supabase_client.table("sections").upsert(
+                    section_inserts, on_conflict="schedule_id,course_id,term,section_letter"
+                ).execute().data or []
+            print(f"Inserted {len(section_inserts)} missing section(s)")
 
             # -------------------------------
             # ASSIGN INSTRUCTORS TO SECTIONS & CALCULATE HOURS
@@ -118,34 +152,36 @@ def register_schedule_routes(app):
             print("=== START INSTRUCTOR ASSIGNMENTS ===")
 
 
-            # Preload all sections for this schedule
-            section_rows = (
-                supabase_client.table("sections")
-                .select("id, schedule_id, course_id, term, section_letter")
-                .eq("schedule_id", schedule_id)
-                .execute()
-            ).data or []
-            print(f"Loaded {len(section_rows)} sections for schedule {schedule_id}")
-
+            # Sections as they stand after the sync above, without reading them back
+            stale_section_ids = set(stale_section_ids)
+            section_rows = [r for r in existing_sections if r["id"] not in stale_section_ids] + inserted_sections
 
             # Map (course_id, term, section_letter) -> section_id
             section_map = {(r["course_id"], r["term"], r["section_letter"]): r["id"] for r in section_rows}
 
+            # Pairs already stored, so only new ones are written
+            existing_pairs = {
+                (r["section_id"], r["instructor_id"])
+                for r in (
+                    supabase_client.table("scheduled_instructors")
+                    .select("section_id,instructor_id")
+                    .eq("schedule_id", schedule_id)
+                    .execute()
+                ).data or []
+            }
+
             # Track what to insert and instructor hours
+            instructor_inserts = []
             instructor_hours = {}  # instructor_id -> {"winter": X, "springSummer": Y, "fall": Z}
 
             for key, value in assignments.items():
                 # key format: "instructorId-scheduledCourseId-semester"
-                print("Assignment key:", key)
-                print("Value:", value)
-
                 instructor_id = value["instructor_id"]
                 scheduled_course_id = value["scheduled_course_id"]
                 section_letter = value["section_letter"]
-                semester = sc_row["term"]
 
                 # Map scheduled_course_id to course_id and term
-                sc_row = next((sc for sc in scheduled_courses_batch if sc["scheduled_course_id"] == scheduled_course_id), None)
+                sc_row = scheduled_courses_by_id.get(scheduled_course_id)
                 if not sc_row:
                     print("WARNING: scheduled_course_id not found:", scheduled_course_id)
                     continue
@@ -160,50 +196,70 @@ def register_schedule_routes(app):
 
                 section_id = section_map[lookup_key]
 
-                # --- Insert or skip if exists ---
-                exists = (
-                    supabase_client.table("scheduled_instructors")
-                    .select("id")
-                    .eq("schedule_id", schedule_id)
-                    .eq("section_id", section_id)
-                    .eq("instructor_id", instructor_id)
-                    .execute()
-                )
-                if exists.data:
-                        print(f"Instructor {instructor_id} already assigned to section {section_letter} of course {course_id}")
-                else:
-                    supabase_client.table("scheduled_instructors").insert({
+                if (section_id, instructor_id) not in existing_pairs:
+                    existing_pairs.add((section_id, instructor_id))
+                    instructor_inserts.append({
                         "schedule_id": schedule_id,
                         "section_id": section_id,
                         "instructor_id": instructor_id
-                    }).execute()
-                    print(f"Inserted instructor {instructor_id} into section {section_letter} of course {course_id}")
+                    })
 
                 # --- Track weekly hours ---
                 weekly_hours = value.get("weekly_hours") or 0
-                instructor_hours.setdefault(instructor_id, {"winter":0,"springSummer":0,"fall":0})
-                instructor_hours[instructor_id][semester] += weekly_hours
-                print(f"Tracking {weekly_hours} weekly hours for instructor {instructor_id} in {semester}")
-
-
-                # --- Update instructor CCH totals ---
-                total_weeks = 15
-                for instr_id, hrs in instructor_hours.items():
-                    total_hours = sum(hrs.values()) * total_weeks
-                    winter_hours = hrs["winter"] * total_weeks
-                    spring_summer_hours = hrs["springSummer"] * total_weeks
-                    fall_hours = hrs["fall"] * total_weeks
-
-                    print(f"Updating instructor {instr_id} CCH: total={total_hours}, winter={winter_hours}, spring/summer={spring_summer_hours}, fall={fall_hours}")
-                    supabase_client.table("instructors").update({
-                        "total_cch": f"{int(total_hours)} hours",
-                        "winter_cch": f"{int(winter_hours)} hours",
-                        "spring_summer_cch": f"{int(spring_summer_hours)} hours",
-                        "fall_cch": f"{int(fall_hours)} hours"
-                    }).eq("instructor_id", instr_id).execute()
-
-                print("=== FINISHED INSTRUCTOR ASSIGNMENTS ===")
-                return jsonify({"message": "Schedule saved successfully"}), 200
+                hrs = instructor_hours.setdefault(instructor_id, {"winter": 0, "springSummer": 0, "fall": 0})
+                hrs[term] = hrs.get(term, 0) + weekly_hours
+
+            if instructor_inserts:
+                supabase_client.table("scheduled_instructors").upsert(
+                    instructor_inserts, on_conflict="schedule_id,section_id,instructor_id"
+                ).execute()
+            print(f"Inserted {len(instructor_inserts)} instructor assignment(s)")
+
+            # -------------------------------
+            # UPDATE INSTRUCTOR CCH TOTALS
+            # Summed over the whole payload first, then written in one upsert
+            # -------------------------------
+            total_weeks = DEFAULT_HOURS_POLICY["weeks_per_term"]
+
+            # The upsert below would insert a bare instructors row for an unknown id, so only
+            # instructors that already exist get their totals written
+            known_ids = set()
+            if instructor_hours:
+                known_ids = {
+                    r["instructor_id"] for r in (
+                        supabase_client.table("instructors")
+                        .select("instructor_id")
+                        .in_("instructor_id", list(instructor_hours))
+                        .execute()
+                    ).data or []
+                }
+
+            cch_rows = []
+            for instr_id, hrs in instructor_hours.items():
+                if instr_id not in known_ids:
+                    print(f"WARNING: instructor {instr_id} not found — CCH totals not written")
+                    continue
+                total_hours = sum(hrs.values()) * total_weeks
+                winter_hours = hrs["winter"] * total_weeks
+                spring_summer_hours = hrs["springSummer"] * total_weeks
+                fall_hours = hrs["fall"] * total_weeks
+
+                print(f"Instructor {instr_id} CCH: total={total_hours}, winter={winter_hours}, spring/summer={spring_summer_hours}, fall={fall_hours}")
+                cch_rows.append({
+                    "instructor_id": instr_id,
+                    "total_cch": f"{int(total_hours)} hours",
+                    "winter_cch": f"{int(winter_hours)} hours",
+                    "spring_summer_cch": f"{int(spring_summer_hours)} hours",
+                    "fall_cch": f"{int(fall_hours)} hours"
+                })
+
+            if cch_rows:
+                supabase_client.table("instructors").upsert(cch_rows, on_conflict="instructor_id").execute()
+                invalidate_reference("instructors")
+            print(f"Updated CCH totals for {len(cch_rows)} instructor(s)")
+
+            print("=== FINISHED INSTRUCTOR ASSIGNMENTS ===")
+            return jsonify({"message": "Schedule saved successfully"}), 200
 
         except Exception as e:
             print("Error saving schedule:", e)
@@ -388,14 +444,11 @@ def register_schedule_routes(app):
     def get_instructors_for_schedule(schedule_id):
         try:
             # fetch ALL instructors
-            instructors_resp = (
-                supabase_client.table("instructors")
-                .select("*")
-                .execute()
+            instructors = get_reference(
+                "instructors", "all",
+                lambda: supabase_client.table("instructors").select("*").execute().data or []
             )
 
-            instructors = instructors_resp.data or []
-
             return jsonify({
                 "instructors": instructors
             }), 200
@@ -403,114 +456,372 @@ def register_schedule_routes(app):
         except Exception as e:
             return jsonify({"error": str(e)}), 500
         
+    def parse_auto_assign_options(data):
+        """
+        Turn the optional auto-assign body into solver keyword arguments:
+        {
+            "warm_start": bool,
+            "fixed_section_ids": [section ids to keep as-is],
+            "profile": { "max_time_seconds", "num_workers", "random_seed", "relative_gap" },
+            "decompose": bool (solve independent components in parallel, server default if omitted;
+                          synchronous route only, background jobs stream progress from one model),
+            "engine": "auto" | "cpsat" | "flow" | "greedy" (instant preview, not saved),
+            "greedy_hint": bool (seed CP-SAT with the greedy assignment),
+            "presolve": "report" | "strict" | "off" (pre-solve checks, server default if omitted),
+            "timeslot_aware": bool (no overlapping meeting times per instructor, forces CP-SAT),
+            "balance_hours": bool (weekly-hours / annual-CCH soft targets, forces CP-SAT),
+            "hours_policy": { "weekly_min_hours", "weekly_max_hours", "weeks_per_term",
+                              "default_cch_target", "weekly_weight", "annual_weight" },
+            "symmetry_breaking": bool (server default if omitted),
+            "use_cache": bool (reuse the stored result for unchanged inputs, server default if omitted)
+        }
+        Raises ValueError for an invalid profile, engine or presolve mode.
+        """
+        engine = data.get("engine") or "auto"
+        if engine not in ("auto", "cpsat", "flow", "greedy"):
+            raise ValueError(f"unknown engine '{engine}'")
+
+        presolve = data.get("presolve")
+        if presolve is not None and presolve not in ("report", "strict", "off"):
+            raise ValueError(f"unknown presolve mode '{presolve}'")
+
+        return {
+            "warm_start": bool(data.get("warm_start", False)),
+            "fixed_section_ids": data.get("fixed_section_ids") or [],
+            "profile": build_solve_profile(data.get("profile")),
+            "decompose": data.get("decompose"),
+            "engine": engine,
+            "timeslot_aware": bool(data.get("timeslot_aware", False)),
+            "balance_hours": bool(data.get("balance_hours", False)),
+            "hours_policy": build_hours_policy(data.get("hours_policy")),
+            "symmetry_breaking": data.get("symmetry_breaking"),
+            "use_cache": data.get("use_cache"),
+            "greedy_hint": bool(data.get("greedy_hint", False)),
+            "presolve": presolve,
+        }
+
+    def conflict_response(conflict):
+        # another job is writing the same schedule(s) with different options; the client can poll it
+        job = conflict.job
+        return jsonify({
+            "error": "An auto-assign job with different options is already running for this schedule",
+            "job_id": job["job_id"],
+            "schedule_id": job["schedule_id"],
+            "academic_year": job["academic_year"],
+            "status": job["status"]
+        }), 409
+
     # AUTO ASSIGNMENT    
     @app.route("/schedules/<schedule_id>/auto_assign", methods=["POST"])
     def auto_assign_route(schedule_id):
         if not schedule_id:
             return jsonify({"error": "Missing schedule_id"}), 400
 
+        try:
+            solver_options = parse_auto_assign_options(request.get_json(silent=True) or {})
+        except (TypeError, ValueError) as e:
+            return jsonify({"error": f"Invalid auto-assign options: {e}"}), 400
+
         try:
             print("\n" + "="*100)
             print(f"[AUTO ASSIGN] Starting auto-assign for schedule_id={schedule_id}")
+            print(f"[AUTO ASSIGN] Options: {solver_options}")
 
             # ---------------------------------------------------------------------
             # 1. Run solver (with internal debugging)
             # ---------------------------------------------------------------------
             try:
-                print("[AUTO ASSIGN] Calling solver_main()...")
-                assigned_map = solver_main(schedule_id)
+                print("[AUTO ASSIGN] Running the auto-assign job on the solver workers...")
+                solver_stats = {}
+                assigned_map = run_auto_assign(schedule_id, solver_stats, **solver_options)
                 print(f"[AUTO ASSIGN] Solver returned type: {type(assigned_map)}")
                 print(f"[AUTO ASSIGN] Solver raw output: {assigned_map}")
 
+            except JobConflict as conflict:
+                return conflict_response(conflict)
+
             except Exception as solver_error:
                 import traceback
-                print("\n [AUTO ASSIGN] solver_main() crashed!")
+                print("\n [AUTO ASSIGN] Auto-assign job crashed!")
                 print(str(solver_error))
                 print(traceback.format_exc())
                 return jsonify({"error": "Solver crashed — see backend logs"}), 500
 
             # If solver returned None or empty, fail early
             if assigned_map is None:
-                print("🔥 [AUTO ASSIGN ERROR] solver_main() returned None (unexpected!)")
-                return jsonify({"error": "solver_main() returned None"}), 500
+                print("🔥 [AUTO ASSIGN ERROR] Auto-assign job returned None (unexpected!)")
+                return jsonify({"error": "Auto-assign job returned no result"}), 500
 
             if not isinstance(assigned_map, dict):
-                print(f"🔥 [AUTO ASSIGN ERROR] solver_main() returned non-dict: {type(assigned_map)}")
+                print(f"🔥 [AUTO ASSIGN ERROR] Auto-assign job returned non-dict: {type(assigned_map)}")
                 return jsonify({"error": "Invalid solver return format"}), 500
 
+            # Pre-solve checks proved the instance cannot be solved — report why instead of an empty result
+            if solver_stats.get("status") == "PRESOLVE_FAILED":
+                return jsonify({
+                    "success": False,
+                    "error": "Schedule cannot be solved as-is — see the pre-solve report",
+                    "presolve": solver_stats.get("presolve"),
+                    "solver_stats": solver_stats
+                }), 422
+
             # ---------------------------------------------------------------------
-            # 2. Update SECTIONS + SCHEDULED_INSTRUCTORS
+            # 2. SECTIONS + SCHEDULED_INSTRUCTORS are synced inside the solver by
+            #    persist_assignments(), which diffs and writes only changed rows
             # ---------------------------------------------------------------------
-            for scid, section_dict in assigned_map.items():
-
-                print(f"[AUTO ASSIGN] Processing scheduled_course_id={scid}, section_dict={section_dict}")
+            print(f"[AUTO ASSIGN] Write summary: {solver_stats.get('writes')}")
+            print("[AUTO ASSIGN] Auto-assign sync complete.")
+            print("="*100 + "\n")
 
-                if section_dict is None:
-                    print(f"⚠️ WARNING: section_dict for scid={scid} is None — skipping")
-                    continue
+            return jsonify({
+                "success": True,
+                "message": f"Auto-assignment completed for schedule {schedule_id}",
+                "assigned_map": assigned_map,
+                "solver_stats": solver_stats
+            })
 
-                for letter, instructor_id in section_dict.items():
-                    print(f"[AUTO ASSIGN] Updating SC={scid} Letter={letter} → Instructor={instructor_id}")
+        except Exception as e:
+            import traceback
+            print("\n🔥🔥🔥 [AUTO ASSIGN] Uncaught exception:")
+            print(str(e))
+            print(traceback.format_exc())
+            return jsonify({"error": str(e)}), 500
 
-                    # Update SECTIONS table
-                    supabase_client.table("sections") \
-                        .update({"instructor_id": instructor_id}) \
-                        .eq("scheduled_course_id", scid) \
-                        .eq("section_letter", letter) \
-                        .execute()
+    # AUTO ASSIGNMENT (whole academic year, background job)
+    @app.route("/schedules/academic_year/<int:academic_year>/auto_assign", methods=["POST"])
+    def auto_assign_academic_year(academic_year):
+        """
+        Queue the joint auto-assign of every schedule of an academic year, so instructors shared
+        between programs are balanced across all of their schedules. Results are saved per schedule.
+        This is the largest solve in the app, so it runs on the solver workers like the other jobs:
+        returns a job id right away, poll /auto_assign/jobs/<job_id> for progress and the result.
+        Accepts the same optional body as /schedules/<schedule_id>/auto_assign, plus
+        "compare_separate": bool to also time the one-schedule-at-a-time solve (not saved).
+        With "decompose": true the job solves its components in parallel and reports no incumbents.
+        """
+        data = request.get_json(silent=True) or {}
+        try:
+            solver_options = parse_auto_assign_options(data)
+        except (TypeError, ValueError) as e:
+            return jsonify({"error": f"Invalid auto-assign options: {e}"}), 400
 
-                    # UPSERT into scheduled_instructors table
-                    supabase_client.table("scheduled_instructors").upsert(
-                        {
-                            "schedule_id": schedule_id,
-                            "scheduled_course_id": scid,
-                            "section_letter": letter,
-                            "instructor_id": instructor_id
-                        },
-                        on_conflict="schedule_id,scheduled_course_id,section_letter"
-                    ).execute()
+        try:
+            print(f"[AUTO ASSIGN] Queuing year-wide auto-assign for {academic_year}")
+            job, attached = submit_year_auto_assign(
+                academic_year,
+                streamed=not solver_options["decompose"],
+                compare_separate=bool(data.get("compare_separate", False)),
+                **solver_options
+            )
+            return jsonify({
+                "job_id": job["job_id"],
+                "academic_year": academic_year,
+                "status": job["status"],
+                "attached": attached
+            }), 202
 
-            # ---------------------------------------------------------------------
-            # 3. Cleanup stale assignments
-            # ---------------------------------------------------------------------
-            print("[AUTO ASSIGN] Cleaning up stale scheduled_instructors rows...")
+        except JobConflict as conflict:
+            return conflict_response(conflict)
 
-            existing_res = (
-                supabase_client.table("scheduled_instructors")
-                .select("scheduled_course_id, section_letter")
-                .eq("schedule_id", schedule_id)
-                .execute()
-            )
+        except Exception as e:
+            print(f"[AUTO ASSIGN JOB] Failed to submit year-wide job: {e}")
+            return jsonify({"error": str(e)}), 500
 
-            existing_pairs = {(row["scheduled_course_id"], row["section_letter"]) for row in existing_res.data}
-            assigned_pairs = {(scid, letter) for scid, sec in assigned_map.items() for letter in sec.keys()}
-            to_delete = existing_pairs - assigned_pairs
-
-            for scid, letter in to_delete:
-                print(f"[AUTO ASSIGN] Deleting outdated assignment scid={scid}, letter={letter}")
-                supabase_client.table("scheduled_instructors") \
-                    .delete() \
-                    .eq("schedule_id", schedule_id) \
-                    .eq("scheduled_course_id", scid) \
-                    .eq("section_letter", letter) \
-                    .execute()
+    # LOCAL REPAIR
+    @app.route("/schedules/<schedule_id>/repair", methods=["POST"])
+    def repair_schedule(schedule_id):
+        """
+        Re-solve only the part of a schedule touched by a change, keeping everything else as-is.
+        Body (all optional):
+        {
+            "instructor_ids": [instructors whose status / availability changed],
+            "section_ids": [new or changed sections],
+            "ring": int (how many rings of swap candidates to free, default 1),
+            "max_free_sections": int (cap on the freed neighbourhood),
+            "profile": { CP-SAT search parameters, max_time_seconds defaults to the repair limit }
+        }
+        Sections with no instructor or an instructor who is no longer eligible are always included.
+        """
+        data = request.get_json(silent=True) or {}
+        try:
+            ring = int(data.get("ring", 1))
+            max_free = data.get("max_free_sections")
+            max_free = int(max_free) if max_free is not None else None
+            build_solve_profile(data.get("profile"))
+        except (TypeError, ValueError) as e:
+            return jsonify({"error": f"Invalid repair options: {e}"}), 400
 
-            print("[AUTO ASSIGN] Auto-assign sync complete.")
-            print("="*100 + "\n")
+        try:
+            solver_stats = {}
+            assigned_map = repair_main(
+                schedule_id,
+                changed_instructor_ids=data.get("instructor_ids") or [],
+                changed_section_ids=data.get("section_ids") or [],
+                ring=ring,
+                max_free=max_free,
+                stats=solver_stats,
+                profile=data.get("profile"),
+            )
 
             return jsonify({
-                "success": True,
-                "message": f"Auto-assignment completed for schedule {schedule_id}",
-                "assigned_map": assigned_map
+                "success": bool(assigned_map),
+                "message": f"Repair completed for schedule {schedule_id}" if assigned_map else "No feasible repair found",
+                "assigned_map": assigned_map,
+                "solver_stats": solver_stats
             })
 
         except Exception as e:
             import traceback
-            print("\n🔥🔥🔥 [AUTO ASSIGN] Uncaught exception:")
+            print("\n🔥🔥🔥 [REPAIR] Uncaught exception:")
             print(str(e))
             print(traceback.format_exc())
             return jsonify({"error": str(e)}), 500
 
+    # WHAT-IF SCENARIOS
+    @app.route("/schedules/<schedule_id>/scenarios", methods=["POST"])
+    def evaluate_schedule_scenarios(schedule_id):
+        """
+        Solve several variants of a schedule side by side without saving anything.
+        Body: the auto-assign options (applied to every scenario) plus
+        {
+            "scenarios": [
+                {
+                    "name": str,
+                    "add_sections": [{ "course_id", "term", "weekly_hours_required", "timeslots", ... }],
+                    "remove_section_ids": [...],
+                    "remove_instructor_ids": [...],
+                    "fixed_section_ids": [...],
+                    "balance_hours": bool,
+                    "hours_policy": { ... },
+                    "profile": { ... }
+                }
+            ]
+        }
+        Scenarios warm-start from the current assignment unless "warm_start": false is sent, so the
+        baseline row only reports changes when the current schedule can be improved.
+        Returns one comparison row per scenario (a "baseline" row first) with its assigned_map;
+        POST the chosen assigned_map to /schedules/<schedule_id>/scenarios/apply to save it.
+        """
+        data = request.get_json(silent=True) or {}
+        scenarios = data.get("scenarios")
+        if not isinstance(scenarios, list) or not all(isinstance(sc, dict) for sc in scenarios):
+            return jsonify({"error": "scenarios must be a list of objects"}), 400
+        if any(not extra.get("course_id") for sc in scenarios for extra in sc.get("add_sections") or []):
+            return jsonify({"error": "every added section needs a course_id"}), 400
+
+        try:
+            solver_options = parse_auto_assign_options(data)
+            for sc in scenarios:
+                build_solve_profile(sc.get("profile"))
+                build_hours_policy(sc.get("hours_policy"))
+        except (TypeError, ValueError) as e:
+            return jsonify({"error": f"Invalid scenario options: {e}"}), 400
+
+        # options that only make sense for a single saved solve
+        for key in ("decompose", "use_cache", "greedy_hint", "presolve"):
+            solver_options.pop(key, None)
+        solver_options["warm_start"] = bool(data.get("warm_start", True))
+
+        try:
+            solver_stats = {}
+            rows = evaluate_scenarios(schedule_id, scenarios, stats=solver_stats, **solver_options)
+            return jsonify({"scenarios": rows, "solver_stats": solver_stats})
+
+        except Exception as e:
+            import traceback
+            print("\n🔥🔥🔥 [SCENARIOS] Uncaught exception:")
+            print(str(e))
+            print(traceback.format_exc())
+            return jsonify({"error": str(e)}), 500
+
+    @app.route("/schedules/<schedule_id>/scenarios/apply", methods=["POST"])
+    def apply_schedule_scenario(schedule_id):
+        """Save the assigned_map of the scenario the AC chose."""
+        data = request.get_json(silent=True) or {}
+        assigned_map = data.get("assigned_map")
+        if not isinstance(assigned_map, dict):
+            return jsonify({"error": "assigned_map is required"}), 400
+
+        try:
+            solver_stats = {}
+            saved = apply_scenario(schedule_id, assigned_map, solver_stats)
+            return jsonify({"success": True, "assigned_map": saved, "writes": solver_stats.get("writes")})
+
+        except Exception as e:
+            print("Error applying scenario:", e)
+            return jsonify({"error": str(e)}), 500
+
+    # AUTO ASSIGNMENT (background job)
+    @app.route("/schedules/<schedule_id>/auto_assign/jobs", methods=["POST"])
+    def submit_auto_assign_job(schedule_id):
+        """
+        Queue auto-assign on the local solver pool and return a job id right away.
+        A second request for the same schedule attaches to the job that is already running, or gets
+        a 409 with that job's id when its options differ.
+        Accepts the same optional body as /schedules/<schedule_id>/auto_assign.
+        """
+        try:
+            solver_options = parse_auto_assign_options(request.get_json(silent=True) or {})
+        except (TypeError, ValueError) as e:
+            return jsonify({"error": f"Invalid auto-assign options: {e}"}), 400
+
+        if solver_options["decompose"]:
+            return jsonify({"error": "decompose is only available on /schedules/<schedule_id>/auto_assign; "
+                                     "background jobs solve in one model so their progress can stream"}), 400
+
+        try:
+            job, attached = submit_auto_assign(schedule_id, **solver_options)
+            return jsonify({
+                "job_id": job["job_id"],
+                "schedule_id": schedule_id,
+                "status": job["status"],
+                "attached": attached
+            }), 202
+        except JobConflict as conflict:
+            return conflict_response(conflict)
+        except Exception as e:
+            print(f"[AUTO ASSIGN JOB] Failed to submit job: {e}")
+            return jsonify({"error": str(e)}), 500
+
+    @app.route("/auto_assign/jobs/<job_id>", methods=["GET"])
+    def get_auto_assign_job(job_id):
+        """
+        Poll a background auto-assign job.
+        Returns the status, current phase, best objective so far, elapsed time
+        and, once finished, the assigned_map and solver_stats.
+        """
+        status = get_job_status(job_id)
+        if not status:
+            return jsonify({"error": "Job not found"}), 404
+        return jsonify(status), 200
+
+    @app.route("/auto_assign/jobs/<job_id>/events", methods=["GET"])
+    def stream_auto_assign_job(job_id):
+        """
+        Stream a background auto-assign job as Server-Sent Events.
+        Sends phase changes, every improving solution (elapsed time, objective, bound)
+        and a final "done" event with the same payload as the status endpoint.
+        """
+        if not get_job_status(job_id):
+            return jsonify({"error": "Job not found"}), 404
+
+        return Response(
+            stream_with_context(iter_job_events(job_id)),
+            mimetype="text/event-stream",
+            headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+        )
+
+    @app.route("/auto_assign/jobs/<job_id>/accept", methods=["POST"])
+    def accept_auto_assign_incumbent(job_id):
+        """
+        Accept the current best solution of a running job instead of waiting for a proof of optimality.
+        The solver stops within a fraction of a second and saves that assignment.
+        """
+        status = accept_incumbent(job_id)
+        if not status:
+            return jsonify({"error": "Job not found"}), 404
+        return jsonify(status), 202
+
     @app.route("/admin/schedules/generate", methods=["POST"])
     def generate_schedules():
         """
@@ -895,40 +1206,107 @@ def register_schedule_routes(app):
         Fetch all schedules for admin review.
         Returns schedules with submission_status in ('submitted', 'recalled') or approval_status = 'approved'.
         Includes academic chair name, programs, and combined status.
+
+        Optional query params:
+          academic_year, academic_chair_id
+          program_id: schedules whose associated_programs list contains exactly this id
+          status: 'approved' or a submission_status ('submitted', 'recalled', 'not_submitted', ...)
+          page (1-based) and page_size (max 200); without them every matching schedule is returned
+        Every lookup is one query for the whole page (paged past PostgREST's row limit when unpaginated),
+        so the round trips do not grow with the schedule count.
         """
         try:
+            academic_year = request.args.get("academic_year", type=int)
+            academic_chair_id = request.args.get("academic_chair_id")
+            program_id = request.args.get("program_id")
+            status = request.args.get("status")
+            page = request.args.get("page", type=int)
+            page_size = request.args.get("page_size", type=int)
+
+            if page is not None and page < 1:
+                return jsonify({"error": "page must be 1 or greater"}), 400
+            if page_size is not None and not 1 <= page_size <= 200:
+                return jsonify({"error": "page_size must be between 1 and 200"}), 400
+            if page_size and not page:
+                page = 1
+            if page and not page_size:
+                page_size = 50
+
+            def schedules_query():
+                query = supabase_client.table("schedules").select(
+                    "id, academic_year, academic_chair_id, submission_status, approval_status, "
+                    "associated_programs, created_at, updated_at",
+                    count="exact"
+                )
+                if academic_year:
+                    query = query.eq("academic_year", academic_year)
+                if academic_chair_id:
+                    query = query.eq("academic_chair_id", academic_chair_id)
+                if program_id:
+                    # whole entries of the comma-separated list only, so program 1 does not match 10 or 21
+                    query = query.filter("associated_programs", "match", rf"(^|,)\s*{re.escape(program_id)}\s*(,|$)")
+                if status == "approved":
+                    query = query.eq("approval_status", "approved")
+                elif status:
+                    query = query.eq("submission_status", status).or_("approval_status.is.null,approval_status.neq.approved")
+
+                # Most recently updated first, matching the date_submitted sort below; id keeps pages stable
+                return query.order("updated_at", desc=True).order("id")
+
             # Fetch schedules with their academic chair information
             try:
-                schedules_response = supabase_client.table("schedules").select(
-                    "id, academic_year, academic_chair_id, submission_status, approval_status, "
-                    "associated_programs, created_at, updated_at"
-                ).execute()
+                if page:
+                    offset = (page - 1) * page_size
+                    schedules_response = schedules_query().range(offset, offset + page_size - 1).execute()
+                    filtered_schedules = schedules_response.data or []
+                    total = schedules_response.count if schedules_response.count is not None else len(filtered_schedules)
+                else:
+                    filtered_schedules = fetch_all_rows(schedules_query)
+                    total = len(filtered_schedules)
             except Exception as e:
                 print(f"Error fetching schedules: {e}")
                 return jsonify({"error": "Failed to fetch schedules", "details": str(e)}), 500
-            
-            if not schedules_response.data:
-                return jsonify({"schedules": []}), 200
-            
-            # Use all schedules (no filtering)
-            filtered_schedules = schedules_response.data
-            
-            # Fetch all users to get academic chair names
+
+            pagination = {"total": total, "page": page, "page_size": page_size}
+
+            if not filtered_schedules:
+                return jsonify({"schedules": [], **pagination}), 200
+
+            schedule_ids = [schedule["id"] for schedule in filtered_schedules]
+            chair_ids = list({schedule["academic_chair_id"] for schedule in filtered_schedules if schedule.get("academic_chair_id")})
+
+            # Fetch the academic chairs on this page to get their names
             try:
-                users_response = supabase_client.table("users").select("id, first_name, last_name").execute()
-                users_map = {u["id"]: f"{u.get('first_name', '')} {u.get('last_name', '')}" for u in (users_response.data or [])}
+                users_response = supabase_client.table("users").select("id, first_name, last_name").in_("id", chair_ids).execute() if chair_ids else None
+                users_map = {u["id"]: f"{u.get('first_name', '')} {u.get('last_name', '')}" for u in (users_response.data if users_response else [])}
             except Exception as e:
                 print(f"Error fetching users: {e}")
                 users_map = {}
-            
-            # Fetch all programs to get program names
+
+            # Program names come from the cached programs table
             try:
-                programs_response = supabase_client.table("programs").select("program_id, program").execute()
-                programs_map = {p["program_id"]: p.get("program", p["program_id"]) for p in (programs_response.data or [])}
+                programs = get_reference("programs", "all", lambda: supabase_client.table("programs").select("*").execute().data or [])
+                programs_map = {p["program_id"]: p.get("program", p["program_id"]) for p in programs}
             except Exception as e:
                 print(f"Error fetching programs: {e}")
                 programs_map = {}
-            
+
+            # Fetch section counts for every listed schedule in one query, paged so none are cut off
+            try:
+                scheduled_courses = fetch_all_rows(
+                    lambda: supabase_client.table("scheduled_courses")
+                    .select("scheduled_course_id, schedule_id, num_sections")
+                    .in_("schedule_id", schedule_ids)
+                    .order("scheduled_course_id")
+                )
+            except Exception as e:
+                print(f"Error fetching scheduled courses: {e}")
+                scheduled_courses = []
+
+            num_sections_by_schedule = {}
+            for sc in scheduled_courses:
+                num_sections_by_schedule.setdefault(sc["schedule_id"], []).append(sc["num_sections"])
+
             # Build response data
             result = []
             for schedule in filtered_schedules:
@@ -942,9 +1320,8 @@ def register_schedule_routes(app):
                     program_names = [programs_map.get(pid.strip(), pid.strip()) for pid in program_ids if pid.strip()]
                     
                     # Check if section counts need to be assigned
-                    scheduled_courses_resp = supabase_client.table("scheduled_courses").select("num_sections").eq("schedule_id", schedule["id"]).execute()
-                    scheduled_courses = scheduled_courses_resp.data or []
-                    section_counts_required = all(sc["num_sections"] == 1 for sc in scheduled_courses) if scheduled_courses else False
+                    num_sections = num_sections_by_schedule.get(schedule["id"], [])
+                    section_counts_required = all(n == 1 for n in num_sections) if num_sections else False
                     
                     # Determine combined status
                     approval_status = schedule.get("approval_status", "pending")
@@ -976,7 +1353,7 @@ def register_schedule_routes(app):
             # Sort by date submitted (most recent first)
             result.sort(key=lambda x: x.get("date_submitted", ""), reverse=True)
             
-            return jsonify({"schedules": result}), 200
+            return jsonify({"schedules": result, **pagination}), 200
             
         except Exception as e:
             print(f"Error in list_admin_schedules: {e}")
@@ -0,0 +1,103 @@
+# Benchmark: min-cost flow engine and greedy preview vs CP-SAT on the same synthetic load-balancing instances.
+# Nothing is read from or written to Supabase, but scheduling.py still loads the .env file on import.
+#
+# Usage (from app/Backend/flask-server):
+#   python -m artifacts.schedulingprototype.benchmark_engines
+import contextlib
+import io
+import random
+import sys
+import time
+
+from artifacts.schedulingprototype.scheduling import (
+    build_solve_profile,
+    create_model,
+    solve_flow,
+    solve_greedy,
+    solve_model,
+)
+
+# (sections, instructors, courses, qualified instructors per course)
+INSTANCES = [
+    (100, 30, 30, 4),
+    (500, 120, 120, 5),
+    (1000, 200, 250, 6),
+    (2000, 300, 500, 6),
+]
+
+
+def make_instance(num_sections, num_instructors, num_courses, per_course, seed=0):
+    rng = random.Random(seed)
+    qualified = {f"C{c}": rng.sample(range(num_instructors), per_course) for c in range(num_courses)}
+
+    sections = []
+    eligibility = {}
+    for k in range(num_sections):
+        course_id = f"C{k % num_courses}"
+        sec_id = f"S{k}"
+        sections.append({
+            "id": sec_id,
+            "schedule_id": "benchmark",
+            "scheduled_course_id": f"SC{k // 3}",
+            "section_letter": chr(ord("A") + k % 3),
+            "course_id": course_id,
+            "instructor_id": None,
+        })
+        eligibility[sec_id] = list(qualified[course_id])
+
+    instructors = [{"instructor_id": i} for i in range(num_instructors)]
+    return sections, eligibility, instructors
+
+
+def run_cpsat(sections, eligibility, instructors, profile):
+    stats = {}
+    start = time.perf_counter()
+    model, assignments, section_vars = create_model(sections, eligibility, {}, instructors, stats)
+    solve_model(sections, section_vars, model, stats, profile)
+    return stats, time.perf_counter() - start
+
+
+def run_flow(sections, eligibility):
+    stats = {}
+    start = time.perf_counter()
+    solve_flow(sections, eligibility, stats)
+    return stats, time.perf_counter() - start
+
+
+def run_greedy(sections, eligibility):
+    stats = {}
+    start = time.perf_counter()
+    solve_greedy(sections, eligibility, {}, stats)
+    return stats, time.perf_counter() - start
+
+
+def main():
+    profile = build_solve_profile({"max_time_seconds": float(sys.argv[1]) if len(sys.argv) > 1 else 60})
+
+    rows = []
+    for num_sections, num_instructors, num_courses, per_course in INSTANCES:
+        sections, eligibility, instructors = make_instance(num_sections, num_instructors, num_courses, per_course)
+
+        # the solvers print every assignment; keep the benchmark output readable
+        with contextlib.redirect_stdout(io.StringIO()):
+            cpsat_stats, cpsat_seconds = run_cpsat(sections, eligibility, instructors, profile)
+            flow_stats, flow_seconds = run_flow(sections, eligibility)
+            greedy_stats, greedy_seconds = run_greedy(sections, eligibility)
+
+        rows.append((
+            f"{num_sections}x{num_instructors}",
+            cpsat_stats.get("status"), cpsat_stats.get("objective"), cpsat_seconds,
+            flow_stats.get("status"), flow_stats.get("objective"), flow_seconds,
+            greedy_stats.get("objective"), greedy_seconds,
+        ))
+
+    print(f"{'instance':<12}{'cpsat status':<14}{'cpsat obj':>12}{'cpsat s':>10}   {'flow status':<13}{'flow obj':>10}{'flow s':>10}{'speedup':>10}"
+          f"   {'greedy obj':>10}{'greedy s':>10}")
+    for name, c_status, c_obj, c_sec, f_status, f_obj, f_sec, g_obj, g_sec in rows:
+        speedup = c_sec / f_sec if f_sec else float("inf")
+        print(f"{name:<12}{c_status:<14}{c_obj:>12}{c_sec:>10.3f}   {f_status:<13}{f_obj:>10}{f_sec:>10.3f}{speedup:>9.1f}x"
+              f"   {g_obj:>10}{g_sec:>10.3f}")
+
+
+if __name__ == "__main__":
+    main()
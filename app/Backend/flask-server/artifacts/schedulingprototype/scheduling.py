@@ -1,7 +1,23 @@
 import sys
 from ortools.sat.python import cp_model
+from ortools.graph.python import min_cost_flow
 import random
+import time
+import multiprocessing
+import threading
+import atexit
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+import numpy as np
 from supabase import create_client, Client 
+from artifacts.schedulingprototype.solver_cache import (
+    SOLVER_CACHE_ENABLED,
+    fingerprint,
+    load_cached_result,
+    store_result,
+)
+from reference_cache import get_reference
+from database import fetch_all_rows
 from dotenv import load_dotenv 
 import os 
 
@@ -19,6 +35,59 @@ supabase_client: Client = create_client(SUPABASE_URL, SUPABASE_KEY)
 # : Client - type hint that says the variable supabase_client is an object instance 
 # of class Client (a class from the supabase package we imported)
 
+# Default CP-SAT search parameters, overridable per server through the .env file
+# and per request through the solve profile passed to solver_main
+DEFAULT_SOLVE_PROFILE = {
+    "max_time_seconds": float(os.getenv("SOLVER_MAX_TIME_SECONDS", "30")),
+    "num_workers": int(os.getenv("SOLVER_NUM_WORKERS", "8")),
+    "random_seed": int(os.getenv("SOLVER_RANDOM_SEED", "0")),
+    "relative_gap": float(os.getenv("SOLVER_RELATIVE_GAP", "0.0")),
+}
+
+# Contact-hour targets from scheduling_constraints.md: 18-20 h/week per term and the instructor's
+# annual CCH target (cch_target_ay2025, or the default when it is missing).
+# Weights are integers because CP-SAT only takes integer coefficients.
+DEFAULT_HOURS_POLICY = {
+    "weekly_min_hours": float(os.getenv("SOLVER_WEEKLY_MIN_HOURS", "18")),
+    "weekly_max_hours": float(os.getenv("SOLVER_WEEKLY_MAX_HOURS", "20")),
+    "weeks_per_term": int(os.getenv("SOLVER_WEEKS_PER_TERM", "15")),
+    "default_cch_target": float(os.getenv("SOLVER_DEFAULT_CCH_TARGET", "615")),
+    "weekly_weight": int(os.getenv("SOLVER_WEEKLY_HOURS_WEIGHT", "10")),
+    "annual_weight": int(os.getenv("SOLVER_ANNUAL_CCH_WEIGHT", "1")),
+}
+
+# hours are stored in the model as hundredths of an hour (weekly_hours_required is numeric(4,2))
+HOURS_SCALE = 100
+
+# create_model inputs keyed by section id, trimmed down to each component before it is sent to a worker
+PER_SECTION_MODEL_INPUTS = ("section_meetings", "section_hours", "section_hints")
+
+# Order interchangeable sections of a scheduled course so CP-SAT does not explore every permutation of them
+SOLVER_SYMMETRY_BREAKING = os.getenv("SOLVER_SYMMETRY_BREAKING", "true").lower() == "true"
+
+# Pre-solve checks: "report" stops only on proven infeasibility, "strict" also stops on sections nobody
+# can teach and on contact-hour demand above capacity, "off" skips the checks
+SOLVER_PRESOLVE = os.getenv("SOLVER_PRESOLVE", "report").lower()
+
+# Local repair: how far the freed neighbourhood may grow, how long the small re-solve may take,
+# and what moving an existing assignment costs (1000 = raising the busiest instructor's load by one)
+SOLVER_REPAIR_MAX_FREE_SECTIONS = int(os.getenv("SOLVER_REPAIR_MAX_FREE_SECTIONS", "60"))
+SOLVER_REPAIR_MAX_TIME_SECONDS = float(os.getenv("SOLVER_REPAIR_MAX_TIME_SECONDS", "1"))
+SOLVER_REPAIR_MOVE_WEIGHT = int(os.getenv("SOLVER_REPAIR_MOVE_WEIGHT", "500"))
+
+# What-if scenarios: cost of moving an existing assignment, just enough to prefer the current one on ties
+SCENARIO_MOVE_WEIGHT = 1
+
+# Split the eligibility graph into independent components and solve them in separate processes.
+# Off by default: handing components to other processes only pays off on large instances, so even when
+# enabled it needs at least SOLVER_DECOMPOSE_MIN_SECTIONS sections
+SOLVER_DECOMPOSE = os.getenv("SOLVER_DECOMPOSE", "false").lower() == "true"
+SOLVER_DECOMPOSE_MIN_SECTIONS = int(os.getenv("SOLVER_DECOMPOSE_MIN_SECTIONS", "500"))
+SOLVER_MAX_PROCESSES = int(os.getenv("SOLVER_MAX_PROCESSES", str(os.cpu_count() or 1)))
+
+# Rows per request when reading a whole academic year; at most PostgREST's max-rows (1000 by default)
+SECTIONS_PAGE_SIZE = int(os.getenv("SECTIONS_PAGE_SIZE", "1000"))
+
 
 
 # def minutes_to_time(minutes):
@@ -481,6 +550,89 @@ def print_header(title):
     print(title)
     print("=" * len(title) + "\n")
 
+
+def set_phase(stats, phase):
+    # stats doubles as the progress record a background job polls
+    stats["phase"] = phase
+    print(f"[SOLVER] Phase: {phase}")
+
+
+def take_instructor(candidates, value, remaining):
+    # Instructor for the next section that uses these candidates. value(var) reads the solution.
+    # A single section has one Boolean set to 1; an interchangeable group shares one count per
+    # candidate, so the counted instructors are handed out to the group's sections in order.
+    if not candidates:
+        return None
+    key = id(candidates)
+    if key not in remaining:
+        remaining[key] = [instr_id for instr_id, var in candidates for _ in range(value(var))]
+    return remaining[key].pop(0) if remaining[key] else None
+
+
+class SolutionStreamCallback(cp_model.CpSolverSolutionCallback):
+    # Called by CP-SAT for every improving solution. Each one is recorded in stats["solutions"]
+    # (timestamp, objective, bound) and the latest assignment is kept as stats["incumbent"],
+    # so a background job can stream progress and a client can accept the incumbent early.
+    def __init__(self, stats, sections, section_vars):
+        super().__init__()
+        self.stats = stats
+        self.sections = sections
+        self.section_vars = section_vars
+        self.start = time.perf_counter()
+        stats["solutions"] = []
+
+    def on_solution_callback(self):
+        incumbent = {}
+        remaining = {}
+        for sec in self.sections:
+            if not sec.get("section_letter") or not sec.get("course_id"):
+                continue
+            assigned_instr = take_instructor(self.section_vars.get(sec["id"]), self.Value, remaining)
+            incumbent.setdefault(sec["scheduled_course_id"], {})[sec["section_letter"]] = assigned_instr
+
+        self.stats["incumbent"] = incumbent
+        self.stats["best_objective"] = self.ObjectiveValue()
+        self.stats["best_bound"] = self.BestObjectiveBound()
+        self.stats["solutions"].append({
+            "elapsed_seconds": round(time.perf_counter() - self.start, 3),
+            "objective": self.ObjectiveValue(),
+            "bound": self.BestObjectiveBound(),
+        })
+        print(f"[SOLVER] Solution #{len(self.stats['solutions'])}: objective {self.ObjectiveValue()}")
+
+        # the client accepted before there was anything to keep — stop at this first solution
+        if self.stats.get("stop_requested"):
+            print("[SOLVER] Incumbent accepted — stopping search early")
+            self.StopSearch()
+
+
+def watch_stop_request(solver, stats, done, poll_seconds=0.1):
+    # Runs next to solver.Solve(): once the client accepts the incumbent, stop the search right away
+    # instead of waiting for the next improving solution, which may never come while CP-SAT works on the bound
+    while not done.wait(poll_seconds):
+        if stats.get("stop_requested") and stats.get("solutions"):
+            print("[SOLVER] Incumbent accepted — stopping search early")
+            solver.StopSearch()
+            return
+
+
+def apply_overrides(defaults, overrides=None):
+    # start from the server defaults and only accept the known keys from the caller
+    options = dict(defaults)
+    for key, value in (overrides or {}).items():
+        if key not in options or value is None:
+            continue
+        options[key] = type(defaults[key])(value)
+    return options
+
+
+def build_solve_profile(overrides=None):
+    return apply_overrides(DEFAULT_SOLVE_PROFILE, overrides)
+
+
+def build_hours_policy(overrides=None):
+    return apply_overrides(DEFAULT_HOURS_POLICY, overrides)
+
 # ------------------------------------------------------------
 # Data Fetching
 # ------------------------------------------------------------
@@ -506,14 +658,10 @@ def get_sections(schedule_id):
 
 def get_active_instructors():
     print_header("Fetching Active Instructors")
-    response = (
-        supabase_client.table("instructors")
-        .select("*")
-        .ilike("instructor_status", "%active%")
-        .execute()
+    instructors = get_reference(
+        "instructors", "active",
+        lambda: supabase_client.table("instructors").select("*").ilike("instructor_status", "%active%").execute().data or []
     )
-
-    instructors = response.data or []
     print(f"Found {len(instructors)} active instructors")
 
     for i in instructors:
@@ -538,81 +686,754 @@ def count_current_assignments(sections):
     return instructor_load
 
 
-def build_section_eligibility(sections, instructors):
+def get_instructor_qualifications(course_ids):
+    print_header("Fetching Instructor Course Qualifications")
+
+    if not course_ids:
+        return []
+
+    # one bulk query for every course in the schedule instead of one per section, paged on the
+    # primary key because PostgREST cuts a response off at max-rows without an error
+    qualifications = fetch_all_rows(
+        lambda: supabase_client.table("instructor_course_qualifications")
+        .select("instructor_id, course_id")
+        .in_("course_id", list(course_ids))
+        .order("instructor_id")
+        .order("course_id")
+    )
+    print(f"Found {len(qualifications)} qualification rows for {len(course_ids)} course(s)")
+
+    return qualifications
+
+
+def get_instructor_unavailability(instructor_ids):
+    print_header("Fetching Instructor Availability")
+
+    if not instructor_ids:
+        return {}
+
+    # only the rows that rule an instructor out matter for eligibility
+    rows = fetch_all_rows(
+        lambda: supabase_client.table("instructor_availability")
+        .select("instructor_id, timeslot_id")
+        .in_("instructor_id", list(instructor_ids))
+        .eq("is_available", False)
+        .order("instructor_id")
+        .order("timeslot_id")
+    )
+
+    unavailable = {}
+    for row in rows:
+        unavailable.setdefault(row["instructor_id"], set()).add(row["timeslot_id"])
+
+    print(f"Found unavailable timeslots for {len(unavailable)} instructor(s)")
+
+    return unavailable
+
+
+def section_timeslot_ids(section):
+    # sections.timeslots is a jsonb list that holds either timeslot ids or timeslot objects
+    ids = set()
+    for slot in section.get("timeslots") or []:
+        if isinstance(slot, dict):
+            slot = slot.get("timeslot_id")
+        if slot:
+            ids.add(slot)
+    return ids
+
+
+def get_course_hours(course_ids):
+    print_header("Fetching Course Hours")
+
+    if not course_ids:
+        return {}
+
+    response = (
+        supabase_client.table("courses")
+        .select("course_id, class_hrs, online_hrs")
+        .in_("course_id", list(course_ids))
+        .execute()
+    )
+
+    course_hours = {row["course_id"]: row for row in response.data or []}
+    print(f"Found hours for {len(course_hours)} of {len(course_ids)} course(s)")
+
+    return course_hours
+
+
+def compute_section_hours(sections, course_hours):
+    # Weekly contact hours per section, scaled to integers in one pass over column arrays:
+    # sections.weekly_hours_required when it is set, otherwise courses.class_hrs + courses.online_hrs
+    if not sections:
+        return {}
+
+    courses = [course_hours.get(s.get("course_id")) or {} for s in sections]
+    required = np.array([s.get("weekly_hours_required") for s in sections], dtype=float)
+    class_hrs = np.array([c.get("class_hrs") for c in courses], dtype=float)
+    online_hrs = np.array([c.get("online_hrs") for c in courses], dtype=float)
+
+    hours = np.where(np.isnan(required), np.nan_to_num(class_hrs) + np.nan_to_num(online_hrs), required)
+    scaled = np.rint(hours * HOURS_SCALE).astype(np.int64)
+
+    missing = int(np.count_nonzero(scaled == 0))
+    if missing:
+        print(f"  [WARNING] {missing} section(s) have no weekly hours — they do not count towards instructor hours")
+
+    return dict(zip((s["id"] for s in sections), scaled.tolist()))
+
+
+def hours_deviation_report(sections, assigned_map, section_hours, instructors, instructor_ids, policy):
+    # Per-instructor weekly hours per term and annual CCH for the final assignment,
+    # with how far each one is under/over its target (in hours, not the scaled model units)
+    by_key = {(s.get("scheduled_course_id"), s.get("section_letter")): s for s in sections}
+    weekly = {}
+    for scid, letters in assigned_map.items():
+        for letter, instr_id in letters.items():
+            section = by_key.get((scid, letter))
+            if not instr_id or not section:
+                continue
+            term_hours = weekly.setdefault(instr_id, {})
+            term = section.get("term")
+            term_hours[term] = term_hours.get(term, 0) + section_hours.get(section["id"], 0)
+
+    targets = {i["instructor_id"]: i.get("cch_target_ay2025") for i in instructors}
+    low, high = policy["weekly_min_hours"], policy["weekly_max_hours"]
+
+    report = {}
+    for instr_id in instructor_ids:
+        term_hours = {term: h / HOURS_SCALE for term, h in weekly.get(instr_id, {}).items()}
+        annual = sum(term_hours.values()) * policy["weeks_per_term"]
+        target = targets.get(instr_id) or policy["default_cch_target"]
+        report[instr_id] = {
+            "weekly_hours": {term: round(h, 2) for term, h in term_hours.items()},
+            "weekly_under": round(sum(max(0, low - h) for h in term_hours.values()), 2),
+            "weekly_over": round(sum(max(0, h - high) for h in term_hours.values()), 2),
+            "annual_cch": round(annual, 2),
+            "cch_target": target,
+            "annual_under": round(max(0, target - annual), 2),
+            "annual_over": round(max(0, annual - target), 2),
+        }
+    return report
+
+
+WEEK_DAYS = ["monday", "tuesday", "wednesday", "thursday", "friday", "saturday", "sunday"]
+
+
+def time_to_minutes(value):
+    # "HH:MM" or "HH:MM:SS" -> minutes from midnight
+    parts = str(value).split(":")
+    return int(parts[0]) * 60 + int(parts[1])
+
+
+def meeting_minutes(day, start_time, end_time):
+    # a meeting as (start, end) in minutes from Monday 00:00
+    day_offset = WEEK_DAYS.index(str(day).strip().lower()) * 1440
+    return day_offset + time_to_minutes(start_time), day_offset + time_to_minutes(end_time)
+
+
+def get_section_meetings(sections):
+    print_header("Fetching Section Timeslots")
+
+    # sections.timeslots holds timeslot ids (looked up in the timeslots table in one query)
+    # or inline objects with day_of_week / start_time / end_time
+    timeslot_ids = set()
+    for s in sections:
+        timeslot_ids |= {t for t in section_timeslot_ids(s) if not isinstance(t, dict)}
+
+    slot_rows = {}
+    if timeslot_ids:
+        response = (
+            supabase_client.table("timeslots")
+            .select("timeslot_id, day_of_week, start_time, end_time")
+            .in_("timeslot_id", list(timeslot_ids))
+            .execute()
+        )
+        slot_rows = {row["timeslot_id"]: row for row in response.data or []}
+
+    meetings = {}
+    for s in sections:
+        sec_meetings = []
+        for slot in s.get("timeslots") or []:
+            row = slot if isinstance(slot, dict) and slot.get("day_of_week") else slot_rows.get(
+                slot.get("timeslot_id") if isinstance(slot, dict) else slot
+            )
+            if not row:
+                continue
+            try:
+                start, end = meeting_minutes(row["day_of_week"], row["start_time"], row["end_time"])
+            except (KeyError, ValueError, IndexError):
+                print(f"  [WARNING] Section {s['id']} has an unreadable timeslot: {slot}")
+                continue
+            if end > start:
+                sec_meetings.append((start, end))
+        if sec_meetings:
+            meetings[s["id"]] = sec_meetings
+
+    print(f"Found meeting times for {len(meetings)} of {len(sections)} section(s)")
+    return meetings
+
+
+def build_section_eligibility(sections, instructors, qualifications, unavailable=None):
     print_header("Building Section Eligibility")
 
-    instructor_ids = [i["instructor_id"] for i in instructors]
+    unavailable = unavailable or {}
+    active_ids = [i["instructor_id"] for i in instructors]
+    active_set = set(active_ids)
+
+    # Map course_id -> qualified active instructors
+    qualified_by_course = {}
+    for q in qualifications:
+        if q["instructor_id"] in active_set:
+            qualified_by_course.setdefault(q["course_id"], []).append(q["instructor_id"])
+
+    if not qualifications:
+        # the qualifications table has not been populated yet, so there is nothing to filter on
+        print("  [WARNING] No qualification data found — every active instructor is treated as eligible.")
+
     eligibility = {}
 
     for s in sections:
         sec_id = s["id"]
 
-        # You can filter by course, discipline, credentials here later.
-        eligibility[sec_id] = instructor_ids.copy()
+        if qualifications:
+            candidates = qualified_by_course.get(s["course_id"], [])
+        else:
+            candidates = active_ids
+
+        slots = section_timeslot_ids(s)
+        if slots and unavailable:
+            candidates = [i for i in candidates if not (unavailable.get(i, set()) & slots)]
+
+        eligibility[sec_id] = list(candidates)
 
         print(f"  - Section {sec_id} eligible instructors: {eligibility[sec_id]}")
 
     return eligibility
 
+# ------------------------------------------------------------
+# Pre-solve checks
+# ------------------------------------------------------------
+def presolve_checks(sections, section_eligibility, instructors, section_meetings=None, section_hours=None,
+                    hours_policy=None, strict=False):
+    # Cheap checks on the prepared inputs, run before any model is built. Every problem becomes an
+    # issue {check, severity, message, details}; "error" issues mean solving is pointless and the
+    # caller should stop. Counting is done on numpy column arrays so this stays in the milliseconds.
+    start = time.perf_counter()
+    issues = []
+
+    sec_ids = [s["id"] for s in sections]
+    candidate_counts = np.array([len(section_eligibility.get(sec_id) or []) for sec_id in sec_ids], dtype=np.int64)
+
+    # 1. sections nobody can teach (the model would leave them unassigned)
+    uncovered = [sec_ids[k] for k in np.flatnonzero(candidate_counts == 0)]
+    if uncovered:
+        by_id = {s["id"]: s for s in sections}
+        issues.append({
+            "check": "no_eligible_instructor",
+            "severity": "error" if strict else "warning",
+            "message": f"{len(uncovered)} section(s) have no eligible instructor",
+            "details": [
+                {"section_id": sec_id, "course_id": by_id[sec_id].get("course_id"), "section_letter": by_id[sec_id].get("section_letter")}
+                for sec_id in uncovered
+            ],
+        })
+
+    # 2. per-course bottlenecks: a course with n sections and q qualified instructors forces someone to
+    #    take ceil(n / q) of them, which is also a lower bound on the schedule's L_max
+    course_ids = np.array([s.get("course_id") or "" for s in sections], dtype=object)
+    courses, course_index = np.unique(course_ids, return_inverse=True)
+    course_sections = np.bincount(course_index, weights=candidate_counts > 0, minlength=len(courses)).astype(np.int64)
+    course_pool = {}
+    for sec_id, course in zip(sec_ids, course_ids):
+        course_pool.setdefault(course, set()).update(section_eligibility.get(sec_id) or [])
+    course_candidates = np.array([len(course_pool[c]) for c in courses], dtype=np.int64)
+    covered = (course_candidates > 0) & (course_sections > 0)
+    min_load = np.zeros(len(courses), dtype=np.int64)
+    min_load[covered] = -(-course_sections[covered] // course_candidates[covered])
+
+    covered_sections = int(np.count_nonzero(candidate_counts))
+    eligible_instructors = len({i for ids in section_eligibility.values() for i in ids})
+    overall_bound = -(-covered_sections // eligible_instructors) if eligible_instructors else 0
+    l_max_lower_bound = int(max(overall_bound, min_load.max(initial=0)))
+
+    bottlenecks = [
+        {"course_id": courses[k], "sections": int(course_sections[k]), "qualified_instructors": int(course_candidates[k]),
+         "min_load": int(min_load[k])}
+        for k in np.argsort(-min_load)[:10] if covered[k] and min_load[k] > overall_bound
+    ]
+    if bottlenecks:
+        issues.append({
+            "check": "course_bottleneck",
+            "severity": "warning",
+            "message": f"{len(bottlenecks)} course(s) force a higher load than the schedule average ({overall_bound})",
+            "details": bottlenecks,
+        })
+
+    # 3. sections that meet at exactly the same times need distinct instructors (hard when timeslot-aware)
+    if section_meetings:
+        same_time = {}
+        for sec_id in sec_ids:
+            meetings = section_meetings.get(sec_id)
+            if meetings:
+                same_time.setdefault(tuple(meetings), []).append(sec_id)
+        clashes = []
+        for meetings, group in same_time.items():
+            if len(group) < 2:
+                continue
+            pool = {i for sec_id in group for i in section_eligibility.get(sec_id) or []}
+            if len(pool) < len(group):
+                clashes.append({"section_ids": group, "instructors_available": len(pool)})
+        if clashes:
+            issues.append({
+                "check": "timeslot_capacity",
+                "severity": "error",
+                "message": f"{len(clashes)} timeslot(s) have more simultaneous sections than instructors who could teach them",
+                "details": clashes,
+            })
+
+    # 4. contact hours per term against what the eligible instructors can carry at the top of the weekly band
+    if section_hours:
+        policy = hours_policy or build_hours_policy()
+        terms = np.array([str(s.get("term")) for s in sections], dtype=object)
+        hours = np.array([section_hours.get(sec_id, 0) for sec_id in sec_ids], dtype=np.int64) / HOURS_SCALE
+        term_names, term_index = np.unique(terms, return_inverse=True)
+        demand = np.bincount(term_index, weights=hours, minlength=len(term_names))
+        capacity = eligible_instructors * policy["weekly_max_hours"]
+        over = [
+            {"term": term_names[k], "required_hours": round(float(demand[k]), 2), "capacity_hours": capacity}
+            for k in np.flatnonzero(demand > capacity)
+        ]
+        if over:
+            issues.append({
+                "check": "hours_capacity",
+                "severity": "error" if strict else "warning",
+                "message": f"Weekly contact hours exceed instructor capacity in {len(over)} term(s)",
+                "details": over,
+            })
+
+    report = {
+        "feasible": not any(issue["severity"] == "error" for issue in issues),
+        "issues": issues,
+        "l_max_lower_bound": l_max_lower_bound,
+        "elapsed_ms": round((time.perf_counter() - start) * 1000, 2),
+    }
+    for issue in issues:
+        print(f"[PRESOLVE] {issue['severity'].upper()}: {issue['message']}")
+    print(f"[PRESOLVE] {'OK' if report['feasible'] else 'BLOCKED'} in {report['elapsed_ms']} ms (L_max >= {l_max_lower_bound})")
+    return report
+
+
 # ------------------------------------------------------------
 # Model Construction
 # ------------------------------------------------------------
-def create_model(sections, section_eligibility, instructor_load, instructors):
+def find_interchangeable_sections(sections, section_eligibility, section_meetings=None, section_hours=None,
+                                  skip_ids=None):
+    # Sections of one scheduled course that the model cannot tell apart: same candidates, same
+    # meeting times, same hours and term. Any solution can permute instructors among them, so
+    # they are returned as groups (in section order) and modelled as one unit by create_model.
+    section_meetings = section_meetings or {}
+    section_hours = section_hours or {}
+    skip_ids = skip_ids or set()
+
+    groups = {}
+    for s in sections:
+        sec_id = s["id"]
+        if sec_id in skip_ids or not section_eligibility.get(sec_id):
+            continue
+        key = (
+            s.get("scheduled_course_id"),
+            s.get("term"),
+            tuple(section_eligibility[sec_id]),
+            tuple(section_meetings.get(sec_id) or ()),
+            section_hours.get(sec_id, 0),
+        )
+        groups.setdefault(key, []).append(sec_id)
+
+    return [ids for ids in groups.values() if len(ids) > 1]
+
+
+def create_model(sections, section_eligibility, instructor_load, instructors, stats=None,
+                 warm_start=False, fixed_section_ids=None, section_meetings=None, section_hours=None,
+                 hours_policy=None, symmetry_breaking=None, base_load=None, move_weight=0, section_hints=None):
     print_header("Creating OR-Tools Model")
+    build_start = time.perf_counter()
 
     model = cp_model.CpModel()
     assignments = {}
+    fixed_section_ids = set(fixed_section_ids or [])
+
+    # Symmetry breaking: sections of one scheduled course that the model cannot tell apart are
+    # collapsed into a single unit with one count per candidate ("how many of these sections does
+    # this instructor take") instead of one Boolean per section, so CP-SAT never explores the
+    # permutations of letters. solve_model hands the counted instructors back out to the letters.
+    # Sections with an existing assignment stay on their own so hints and pins still apply.
+    if symmetry_breaking is None:
+        symmetry_breaking = SOLVER_SYMMETRY_BREAKING
+    groups = []
+    if symmetry_breaking:
+        skip_ids = fixed_section_ids | (
+            {s["id"] for s in sections if s.get("instructor_id")} if warm_start or fixed_section_ids else set()
+        )
+        groups = find_interchangeable_sections(sections, section_eligibility, section_meetings, section_hours, skip_ids)
+    group_of = {sec_id: group for group in groups for sec_id in group}
+
+    # Adjacency lists filled while the variables are created so no later step has to scan the whole grid
+    section_vars = {}     # sec_id -> [(instr_id, var), ...], one list shared by the sections of a group
+    instructor_vars = {}  # instr_id -> [var, ...]
+    units = []            # (section ids, candidates, sections one instructor can take)
 
     print("Creating assignment variables...")
     for section in sections:
         sec_id = section["id"]
+        if sec_id in section_vars:
+            continue
+
+        group = group_of.get(sec_id, [sec_id])
+        # identical meeting times mean one instructor can only take one section of the group
+        cap = 1 if len(group) == 1 or (section_meetings or {}).get(sec_id) else len(group)
+        candidates = []
         for instr_id in section_eligibility[sec_id]:
-            assignments[(sec_id, instr_id)] = model.NewBoolVar(f"{sec_id}_{instr_id}")
+            if cap == 1:
+                var = model.NewBoolVar(f"{sec_id}_{instr_id}")
+            else:
+                var = model.NewIntVar(0, cap, f"n_{section['scheduled_course_id']}_{sec_id}_{instr_id}")
+            candidates.append((instr_id, var))
+            instructor_vars.setdefault(instr_id, []).append(var)
+            for member in group:
+                assignments[(member, instr_id)] = var
+
+        for member in group:
+            section_vars[member] = candidates
+        units.append((group, candidates, cap))
 
     print("Adding section assignment constraints...")
-    for section in sections:
-        sec_id = section["id"]
-        eligible = section_eligibility[sec_id]
-
-        if len(eligible) == 0:
-            print(f"  [WARNING] Section {sec_id} has NO eligible instructors — solver will allow leaving it unassigned.")
+    for group, candidates, cap in units:
+        if len(candidates) == 0:
+            print(f"  [WARNING] Section {group[0]} has NO eligible instructors — solver will allow leaving it unassigned.")
             continue
 
-        model.AddExactlyOne(assignments[(sec_id, instr)] for instr in eligible)
+        if len(group) == 1:
+            model.AddExactlyOne(var for _, var in candidates)
+        else:
+            model.Add(cp_model.LinearExpr.Sum([var for _, var in candidates]) == len(group))
+
+    if groups:
+        grouped = sum(len(g) for g in groups)
+        print(f"  - {len(groups)} interchangeable group(s) covering {grouped} section(s)")
+        if stats is not None:
+            stats["symmetry_breaking"] = {"groups": len(groups), "sections": grouped}
 
     # Instructor load vars
     print("Building instructor load constraints...")
     all_instructors = {i["instructor_id"] for i in instructors}
 
+    # base_load counts sections an instructor already holds outside this model (local repair)
+    base_load = base_load or {}
+    load_cap = len(sections) + max(base_load.values(), default=0)
+
     load_vars = {}
     for instr_id in all_instructors:
-        load_vars[instr_id] = model.NewIntVar(0, len(sections), f"load_{instr_id}")
-        model.Add(
-            load_vars[instr_id] ==
-            sum(assignments[(s["id"], instr_id)]
-                for s in sections
-                if (s["id"], instr_id) in assignments)
-        )
+        load_vars[instr_id] = model.NewIntVar(0, load_cap, f"load_{instr_id}")
+        model.Add(load_vars[instr_id] == base_load.get(instr_id, 0) + cp_model.LinearExpr.Sum(instructor_vars.get(instr_id, [])))
 
-    L_max = model.NewIntVar(0, len(sections), "L_max")
+    L_max = model.NewIntVar(0, load_cap, "L_max")
 
     for instr_id in load_vars:
         model.Add(load_vars[instr_id] <= L_max)
 
+    # Timeslot-aware mode: every meeting of a section becomes an optional fixed interval that is
+    # only present when the section is given to that instructor, and each instructor's intervals
+    # must not overlap. One interval per (section, instructor, meeting) instead of a Boolean per timeslot.
+    if section_meetings:
+        print("Adding timeslot non-overlap constraints...")
+        instructor_intervals = {}
+        for group, candidates, cap in units:
+            sec_id = group[0]
+            meetings = section_meetings.get(sec_id) or []
+            for instr_id, var in candidates:
+                for k, (start, end) in enumerate(meetings):
+                    interval = model.NewOptionalFixedSizeIntervalVar(start, end - start, var, f"iv_{sec_id}_{instr_id}_{k}")
+                    instructor_intervals.setdefault(instr_id, []).append(interval)
+
+        no_overlap_count = 0
+        for instr_id, intervals in instructor_intervals.items():
+            if len(intervals) > 1:
+                model.AddNoOverlap(intervals)
+                no_overlap_count += 1
+
+        interval_count = sum(len(v) for v in instructor_intervals.values())
+        print(f"  - {interval_count} optional intervals, {no_overlap_count} no-overlap constraint(s)")
+
+    # Contact-hour soft constraints: per instructor and term, the weekly hours should sit inside the
+    # 18-20 h band; per instructor, the annual CCH (weekly hours x weeks per term) should meet the target.
+    # Under/over deviation variables measure the miss and are weighted into the objective.
+    hours_cost = 0
+    if section_hours:
+        print("Adding weekly-hours and annual-CCH soft constraints...")
+        policy = hours_policy or build_hours_policy()
+        weekly_low = int(round(policy["weekly_min_hours"] * HOURS_SCALE))
+        weekly_high = int(round(policy["weekly_max_hours"] * HOURS_SCALE))
+        weeks = policy["weeks_per_term"]
+        targets = {i["instructor_id"]: i.get("cch_target_ay2025") for i in instructors}
+
+        term_by_section = {section["id"]: section.get("term") for section in sections}
+        term_terms = {}  # (instr_id, term) -> [(var, scaled hours, max value of var), ...]
+        for group, candidates, cap in units:
+            hours = section_hours.get(group[0], 0)
+            if not hours:
+                continue
+            for instr_id, var in candidates:
+                term_terms.setdefault((instr_id, term_by_section[group[0]]), []).append((var, hours, cap))
+
+        weekly_devs = []
+        annual_terms = {}
+        for (instr_id, term), terms in term_terms.items():
+            term_vars, term_hours, caps = zip(*terms)
+            weekly = cp_model.LinearExpr.WeightedSum(term_vars, term_hours)
+            under = model.NewIntVar(0, weekly_low, f"wk_under_{instr_id}_{term}")
+            over = model.NewIntVar(0, sum(h * c for h, c in zip(term_hours, caps)), f"wk_over_{instr_id}_{term}")
+            model.Add(under >= weekly_low - weekly)
+            model.Add(over >= weekly - weekly_high)
+            weekly_devs += [under, over]
+            annual_terms.setdefault(instr_id, []).extend(terms)
+
+        annual_devs = []
+        for instr_id, terms in annual_terms.items():
+            target = int(round((targets.get(instr_id) or policy["default_cch_target"]) * HOURS_SCALE))
+            annual_vars, annual_hours, caps = zip(*terms)
+            annual_hours = [h * weeks for h in annual_hours]
+            annual = cp_model.LinearExpr.WeightedSum(annual_vars, annual_hours)
+            under = model.NewIntVar(0, target, f"cch_under_{instr_id}")
+            over = model.NewIntVar(0, sum(h * c for h, c in zip(annual_hours, caps)), f"cch_over_{instr_id}")
+            model.Add(under >= target - annual)
+            model.Add(over >= annual - target)
+            annual_devs += [under, over]
+
+        hours_cost = (
+            policy["weekly_weight"] * cp_model.LinearExpr.Sum(weekly_devs)
+            + policy["annual_weight"] * cp_model.LinearExpr.Sum(annual_devs)
+        )
+        print(f"  - {len(weekly_devs) // 2} instructor/term weekly targets, {len(annual_devs) // 2} annual CCH targets")
+
+    # Incremental re-solve: existing sections.instructor_id values become solution hints,
+    # and sections the AC has confirmed by hand are pinned to their current instructor
+    # Seed hints (sec_id -> instructor, e.g. the greedy preview) for every unit the warm start below
+    # does not already cover; a group is hinted with how many of its sections each instructor got
+    if section_hints:
+        print("Adding seed hints...")
+        warm_handled = {s["id"] for s in sections if s.get("instructor_id")} if warm_start or fixed_section_ids else set()
+        seeded = 0
+        for group, candidates, cap in units:
+            if any(sec_id in warm_handled for sec_id in group):
+                continue
+            counts = {}
+            for sec_id in group:
+                hint = section_hints.get(sec_id)
+                if hint is not None:
+                    counts[hint] = counts.get(hint, 0) + 1
+            if not counts:
+                continue
+            for instr_id, var in candidates:
+                model.AddHint(var, counts.get(instr_id, 0))
+            seeded += len(group)
+
+        if not warm_start:
+            # hint the loads as well so the seed is a complete solution CP-SAT can start from
+            hinted_load = dict(base_load)
+            for hint in section_hints.values():
+                if hint is not None:
+                    hinted_load[hint] = hinted_load.get(hint, 0) + 1
+            for instr_id, load_var in load_vars.items():
+                model.AddHint(load_var, hinted_load.get(instr_id, 0))
+            model.AddHint(L_max, max((hinted_load.get(i, 0) for i in load_vars), default=0))
+        print(f"  - {seeded} section(s) seeded")
+        if stats is not None:
+            stats["seed_hints"] = seeded
+
+    if warm_start or fixed_section_ids:
+        print("Adding warm-start hints from existing assignments...")
+        hinted = fixed = dropped = 0
+
+        for section in sections:
+            sec_id = section["id"]
+            current = section.get("instructor_id")
+            if not current:
+                continue
+
+            candidates = section_vars[sec_id]
+            if current not in {instr_id for instr_id, _ in candidates}:
+                # current instructor is no longer eligible, so the hint would be infeasible
+                dropped += 1
+                continue
+
+            for instr_id, var in candidates:
+                if sec_id in fixed_section_ids:
+                    model.Add(var == (1 if instr_id == current else 0))
+                else:
+                    model.AddHint(var, 1 if instr_id == current else 0)
+
+            if sec_id in fixed_section_ids:
+                fixed += 1
+            else:
+                hinted += 1
+
+        if warm_start:
+            for instr_id, load_var in load_vars.items():
+                model.AddHint(load_var, instructor_load.get(instr_id, 0))
+
+        print(f"  - {hinted} section(s) hinted, {fixed} fixed, {dropped} existing assignment(s) no longer eligible")
+        if stats is not None:
+            stats["warm_start"] = {"hinted": hinted, "fixed": fixed, "dropped": dropped}
+
+    # Minimal disturbance: every section taken away from its current instructor costs move_weight
+    move_cost = 0
+    if move_weight:
+        kept_vars = [
+            var for section in sections if section.get("instructor_id")
+            for instr_id, var in section_vars[section["id"]] if instr_id == section["instructor_id"]
+        ]
+        movable = sum(1 for section in sections if section.get("instructor_id"))
+        move_cost = move_weight * (movable - cp_model.LinearExpr.Sum(kept_vars))
+
     print("Setting fairness optimization...")
-    model.Minimize(L_max * 1000 + sum(load_vars.values()))
+    model.Minimize(L_max * 1000 + cp_model.LinearExpr.Sum(list(load_vars.values())) + hours_cost + move_cost)
+
+    build_ms = round((time.perf_counter() - build_start) * 1000, 1)
+    proto = model.Proto()
+    print(f"[TIMING] Model build took {build_ms} ms ({len(assignments)} assignment variables, {len(load_vars)} instructors)")
+    print(f"[SOLVER] Model size: {len(proto.variables)} variables, {len(proto.constraints)} constraints")
+    if stats is not None:
+        stats.setdefault("timings_ms", {})["model_build"] = build_ms
+        stats["model_size"] = {"variables": len(proto.variables), "constraints": len(proto.constraints)}
 
     print("[DEBUG] Model creation complete.\n")
-    return model, assignments
+    return model, assignments, section_vars
+
+# ------------------------------------------------------------
+# Persistence
+# ------------------------------------------------------------
+def persist_assignments(schedule_id, sections, assigned_map, stats=None):
+    # Diff assigned_map against the rows we already have and write only what changed.
+    # Always a constant number of round trips: 1 select + at most 1 upsert per table + 1 delete.
+    print_header(f"Saving Assignments for Schedule {schedule_id}")
+    write_start = time.perf_counter()
+    round_trips = 0
+
+    # -------------------------
+    # Sections whose instructor actually changed (safely handling NOT NULL columns)
+    # -------------------------
+    section_upserts = []
+    for sec in sections:
+        scid = sec.get("scheduled_course_id")
+        letter = sec.get("section_letter")
+        course_id = sec.get("course_id")
+
+        if not letter or not course_id:
+            continue
+        if letter not in assigned_map.get(scid, {}):
+            continue
+
+        instructor_id = assigned_map[scid][letter]
+        if instructor_id == sec.get("instructor_id"):
+            continue
+
+        section_upserts.append({
+            "id": sec["id"],
+            "schedule_id": sec["schedule_id"],
+            "course_id": course_id,
+            "section_letter": letter,
+            "delivery_mode": sec.get("delivery_mode") or "TBD",  # default if null
+            "instructor_id": instructor_id
+        })
+
+    if section_upserts:
+        supabase_client.table("sections").upsert(section_upserts).execute()
+        round_trips += 1
+    print(f"[PERSIST] {len(section_upserts)} section(s) changed")
+
+    # -------------------------
+    # scheduled_instructors: keyed on section_id like save_schedule, so both write the same rows
+    # -------------------------
+    existing_res = (
+        supabase_client.table("scheduled_instructors")
+        .select("id, section_id, instructor_id")
+        .eq("schedule_id", schedule_id)
+        .execute()
+    )
+    round_trips += 1
+    existing = {(row["section_id"], row["instructor_id"]): row for row in existing_res.data or []}
+
+    solved_section_ids = set()
+    assigned_pairs = set()
+    for sec in sections:
+        solved_section_ids.add(sec["id"])
+        instr_id = assigned_map.get(sec.get("scheduled_course_id"), {}).get(sec.get("section_letter"))
+        if instr_id:
+            assigned_pairs.add((sec["id"], instr_id))
+
+    si_upserts = [
+        {"schedule_id": schedule_id, "section_id": section_id, "instructor_id": instr_id}
+        for section_id, instr_id in assigned_pairs
+        if (section_id, instr_id) not in existing
+    ]
+
+    if si_upserts:
+        supabase_client.table("scheduled_instructors").upsert(
+            si_upserts, on_conflict="schedule_id,section_id,instructor_id"
+        ).execute()
+        round_trips += 1
+    print(f"[PERSIST] {len(si_upserts)} scheduled_instructors row(s) upserted")
+
+    # only rows of the sections this solve covered are replaced
+    stale_ids = [
+        row["id"] for pair, row in existing.items()
+        if pair[0] in solved_section_ids and pair not in assigned_pairs
+    ]
+    if stale_ids:
+        supabase_client.table("scheduled_instructors").delete().in_("id", stale_ids).execute()
+        round_trips += 1
+    print(f"[PERSIST] {len(stale_ids)} outdated scheduled_instructors row(s) removed")
+
+    write_ms = round((time.perf_counter() - write_start) * 1000, 1)
+    print(f"[TIMING] Persistence took {write_ms} ms over {round_trips} round trip(s)")
+
+    if stats is not None:
+        stats.setdefault("timings_ms", {})["persist"] = write_ms
+        stats["writes"] = {
+            "sections_updated": len(section_upserts),
+            "scheduled_instructors_upserted": len(si_upserts),
+            "scheduled_instructors_deleted": len(stale_ids),
+            "round_trips": round_trips
+        }
 
 # ------------------------------------------------------------
 # Solve and Return Results
 # ------------------------------------------------------------
-def solve_and_save(sections, assignments, model):
+def solve_model(sections, section_vars, model, stats=None, profile=None):
     print_header("Solving Model")
+    if stats is None:
+        stats = {}
+    timings = stats.setdefault("timings_ms", {})
+    profile = profile or build_solve_profile()
 
     solver = cp_model.CpSolver()
-    status = solver.Solve(model)
+    solver.parameters.max_time_in_seconds = profile["max_time_seconds"]
+    solver.parameters.num_workers = profile["num_workers"]
+    solver.parameters.random_seed = profile["random_seed"]
+    solver.parameters.relative_gap_limit = profile["relative_gap"]
+    print(f"[SOLVER] Profile: {profile}")
+
+    solve_start = time.perf_counter()
+    solve_done = threading.Event()
+    callback = SolutionStreamCallback(stats, sections, section_vars)
+    watcher = threading.Thread(target=watch_stop_request, args=(solver, stats, solve_done), daemon=True)
+    watcher.start()
+    try:
+        status = solver.Solve(model, callback)
+    finally:
+        solve_done.set()
+        watcher.join()
+    timings["solve"] = round((time.perf_counter() - solve_start) * 1000, 1)
 
     status_codes = {
         cp_model.OPTIMAL: "OPTIMAL",
@@ -623,6 +1444,14 @@ def solve_and_save(sections, assignments, model):
     }
     print(f"[SOLVER STATUS] {status_codes.get(status, status)}")
 
+    stats["profile"] = profile
+    stats["status"] = status_codes.get(status, str(status))
+    stats["wall_time_seconds"] = round(solver.WallTime(), 3)
+    if status in (cp_model.OPTIMAL, cp_model.FEASIBLE):
+        stats["objective"] = solver.ObjectiveValue()
+        stats["best_bound"] = solver.BestObjectiveBound()
+        print(f"[SOLVER] Objective {stats['objective']} (bound {stats['best_bound']}) in {stats['wall_time_seconds']}s")
+
     # -------------------------
     # Map: scheduled_course_id -> section_letter -> instructor_id
     # -------------------------
@@ -630,6 +1459,11 @@ def solve_and_save(sections, assignments, model):
 
     if status in (cp_model.OPTIMAL, cp_model.FEASIBLE):
         print("\nAssignments Found:")
+        extract_start = time.perf_counter()
+
+        # Read every variable value in one go, indexed by variable index
+        solution = solver.ResponseProto().solution
+        remaining = {}
 
         for sec in sections:
             sec_id = sec["id"]
@@ -641,12 +1475,8 @@ def solve_and_save(sections, assignments, model):
                 print(f"[WARNING] Skipping section {sec_id}: missing section_letter or course_id")
                 continue
 
-            # Find assigned instructor
-            assigned_instr = None
-            for (s_id, instr_id), var in assignments.items():
-                if s_id == sec_id and solver.Value(var) == 1:
-                    assigned_instr = instr_id
-                    break
+            # Find assigned instructor among this section's own candidates
+            assigned_instr = take_instructor(section_vars.get(sec_id), lambda var: solution[var.Index()], remaining)
 
             # Build map
             if scid not in assigned_map:
@@ -655,90 +1485,392 @@ def solve_and_save(sections, assignments, model):
 
             print(f"  - Section {sec_id} ({course_id}-{letter}) → Instructor {assigned_instr}")
 
-        # -------------------------
-        # Upsert to sections table (safely handling NOT NULL columns)
-        # -------------------------
-        upserts = []
-        for sec in sections:
-            scid = sec.get("scheduled_course_id")
-            letter = sec.get("section_letter")
-            course_id = sec.get("course_id")
-            delivery_mode = sec.get("delivery_mode") or "TBD"  # default if null
+        timings["extract"] = round((time.perf_counter() - extract_start) * 1000, 1)
+        print(f"[TIMING] Solve took {timings['solve']} ms, extraction took {timings['extract']} ms")
 
-            if not letter or not course_id:
-                print(f"[WARNING] Skipping section {sec['id']}: missing section_letter or course_id")
-                continue
+    else:
+        print("\n[WARNING] Solver could not find a feasible solution.")
+        return {}
 
-            instructor_id = assigned_map.get(scid, {}).get(letter)
+    # the incumbent is only useful while the search is running; the final map is the result
+    stats.pop("incumbent", None)
+
+    return assigned_map
+
+
+# ------------------------------------------------------------
+# Decomposition into independent subproblems
+# ------------------------------------------------------------
+def find_eligibility_components(sections, section_eligibility):
+    # Union-find over sections: two sections are in the same component when some instructor
+    # is eligible for both. Components share no instructors, so they can be solved separately.
+    parent = {}
+
+    def find(x):
+        while parent[x] != x:
+            parent[x] = parent[parent[x]]
+            x = parent[x]
+        return x
+
+    first_section_of = {}  # instr_id -> first section seen for that instructor
+    for s in sections:
+        sec_id = s["id"]
+        if not section_eligibility.get(sec_id):
+            continue  # sections with no candidates have no variables to solve
+        parent[sec_id] = sec_id
+        for instr_id in section_eligibility[sec_id]:
+            if instr_id in first_section_of:
+                root_a, root_b = find(sec_id), find(first_section_of[instr_id])
+                if root_a != root_b:
+                    parent[root_a] = root_b
+            else:
+                first_section_of[instr_id] = sec_id
+
+    components = {}
+    for s in sections:
+        if s["id"] in parent:
+            components.setdefault(find(s["id"]), []).append(s)
+
+    # largest first so the pool starts on the slowest subproblems
+    return sorted(components.values(), key=len, reverse=True)
 
-            upserts.append({
-                "id": sec["id"],
-                "schedule_id": sec["schedule_id"],
-                "course_id": course_id,
-                "section_letter": letter,
-                "delivery_mode": delivery_mode,  # now included
-                "instructor_id": instructor_id
-            })
 
-        if upserts:
-            supabase_client.table("sections").upsert(upserts).execute()
-            print_header(f"Updated {len(upserts)} sections in Supabase")
-
-        # -------------------------
-        # Upsert to scheduled_instructors table
-        # -------------------------
-        si_upserts = []
-        for scid, sec_dict in assigned_map.items():
-            for letter, instr_id in sec_dict.items():
-                if not instr_id:
-                    continue
-                si_upserts.append({
-                    "schedule_id": sections[0]["schedule_id"],  # assumes all sections have same schedule_id
-                    "scheduled_course_id": scid,
-                    "section_letter": letter,
-                    "instructor_id": instr_id
-                })
-
-        if si_upserts:
-            supabase_client.table("scheduled_instructors").upsert(
-                si_upserts, on_conflict="schedule_id,scheduled_course_id,section_letter"
-            ).execute()
-            print_header(f"Upserted {len(si_upserts)} scheduled_instructors rows")
-
-        # -------------------------
-        # Remove outdated scheduled_instructors assignments
-        # -------------------------
-        existing_res = supabase_client.table("scheduled_instructors").select(
-            "scheduled_course_id, section_letter"
-        ).eq("schedule_id", sections[0]["schedule_id"]).execute()
-
-        existing_pairs = {(row["scheduled_course_id"], row["section_letter"]) for row in existing_res.data}
-        assigned_pairs = {(scid, letter) for scid, sec_dict in assigned_map.items() for letter in sec_dict.keys()}
-        to_delete = existing_pairs - assigned_pairs
-
-        for scid, letter in to_delete:
-            print(f"[AUTO ASSIGN] Removing outdated assignment scid={scid}, letter={letter}")
-            supabase_client.table("scheduled_instructors") \
-                .delete() \
-                .eq("scheduled_course_id", scid) \
-                .eq("section_letter", letter) \
-                .eq("schedule_id", sections[0]["schedule_id"]) \
-                .execute()
-
-        print("[AUTO ASSIGN] Sync complete")
+def solve_component(payload):
+    # Runs in a worker process: build and solve one component, no database access
+    sections, section_eligibility, instructor_load, instructors, profile, model_kwargs = payload
+    component_stats = {}
+    start = time.perf_counter()
 
+    model, assignments, section_vars = create_model(
+        sections, section_eligibility, instructor_load, instructors, component_stats, **model_kwargs
+    )
+    assigned_map = solve_model(sections, section_vars, model, component_stats, profile)
+
+    component_stats.pop("solutions", None)
+    component_stats["sections"] = len(sections)
+    component_stats["instructors"] = len(instructors)
+    component_stats["variables"] = len(assignments)
+    component_stats["total_ms"] = round((time.perf_counter() - start) * 1000, 1)
+    return assigned_map, component_stats
+
+
+_component_pool = None
+_component_pool_lock = threading.Lock()
+
+
+def get_component_pool():
+    # One long-lived spawn pool per process: its workers import OR-Tools once and are reused by
+    # every decomposed solve and scenario batch instead of starting a fresh pool each time
+    global _component_pool
+    with _component_pool_lock:
+        if _component_pool is None:
+            pool_size = max(1, min(os.cpu_count() or 1, SOLVER_MAX_PROCESSES))
+            # spawn instead of fork: the Flask process is multi-threaded and OR-Tools keeps its own threads
+            _component_pool = ProcessPoolExecutor(max_workers=pool_size, mp_context=multiprocessing.get_context("spawn"))
+            atexit.register(_component_pool.shutdown, wait=False, cancel_futures=True)
+            print(f"[SOLVER] Started component pool with {pool_size} process(es)")
+        return _component_pool
+
+
+def reset_component_pool():
+    # a worker died (e.g. killed for memory): drop the broken pool so the next solve starts a new one
+    global _component_pool
+    with _component_pool_lock:
+        if _component_pool is not None:
+            _component_pool.shutdown(wait=False, cancel_futures=True)
+            _component_pool = None
+
+
+def solve_components_parallel(components, section_eligibility, instructor_load, instructors, stats, profile,
+                              model_kwargs=None):
+    # model_kwargs are the extra create_model options (warm start, timeslots, ...) shared by every component
+    print_header(f"Solving {len(components)} Independent Components in Parallel")
+
+    cpu_count = os.cpu_count() or 1
+    pool_size = max(1, min(len(components), cpu_count, SOLVER_MAX_PROCESSES))
+
+    # split the CP-SAT search workers between the processes running at the same time
+    component_profile = dict(profile)
+    component_profile["num_workers"] = max(1, profile["num_workers"] // pool_size)
+
+    instructors_by_id = {i["instructor_id"]: i for i in instructors}
+    payloads = []
+    for component in components:
+        component_eligibility = {s["id"]: section_eligibility[s["id"]] for s in component}
+        component_instr_ids = {i for ids in component_eligibility.values() for i in ids}
+
+        # per-section inputs only need this component's sections
+        component_kwargs = dict(model_kwargs or {})
+        for key in PER_SECTION_MODEL_INPUTS:
+            if component_kwargs.get(key):
+                component_kwargs[key] = {sid: component_kwargs[key][sid] for sid in component_eligibility if sid in component_kwargs[key]}
+
+        payloads.append((
+            component,
+            component_eligibility,
+            {i: instructor_load.get(i, 0) for i in component_instr_ids},
+            [instructors_by_id[i] for i in component_instr_ids],
+            component_profile,
+            component_kwargs,
+        ))
+
+    start = time.perf_counter()
+    chunksize = max(1, len(payloads) // (pool_size * 4))
+    try:
+        results = list(get_component_pool().map(solve_component, payloads, chunksize=chunksize))
+    except BrokenProcessPool:
+        reset_component_pool()
+        raise
+
+    assigned_map = {}
+    component_reports = []
+    warm = {"hinted": 0, "fixed": 0, "dropped": 0}
+    infeasible = 0
+    for component_map, component_stats in results:
+        if not component_map:
+            infeasible += 1
+        for scid, letters in component_map.items():
+            assigned_map.setdefault(scid, {}).update(letters)
+        for key in warm:
+            warm[key] += component_stats.get("warm_start", {}).get(key, 0)
+        component_reports.append({
+            "sections": component_stats["sections"],
+            "instructors": component_stats["instructors"],
+            "variables": component_stats["variables"],
+            "status": component_stats.get("status"),
+            "timings_ms": component_stats.get("timings_ms"),
+            "total_ms": component_stats["total_ms"],
+        })
+
+    stats["profile"] = profile
+    if infeasible:
+        stats["status"] = "INFEASIBLE"
+    elif all(r["status"] == "OPTIMAL" for r in component_reports):
+        stats["status"] = "OPTIMAL"
     else:
-        print("\n[WARNING] Solver could not find a feasible solution.")
-        return {}
+        stats["status"] = "FEASIBLE"
+    stats["components"] = component_reports
+    stats.setdefault("timings_ms", {})["solve"] = round((time.perf_counter() - start) * 1000, 1)
+    if any(component_stats.get("warm_start") for _, component_stats in results):
+        stats["warm_start"] = warm
+    print(f"[SOLVER] {len(components)} components solved on {pool_size} process(es), {infeasible} infeasible")
+
+    # one infeasible component means the schedule as a whole has no feasible assignment
+    return {} if infeasible else assigned_map
+# ------------------------------------------------------------
+# Min-cost flow engine for pure load-balancing instances
+# ------------------------------------------------------------
+def solve_flow(sections, section_eligibility, stats=None, warm_start=False, fixed_section_ids=None):
+    # Bottleneck assignment: binary search on L_max, each step a max-flow
+    #   source -> section (cap 1) -> eligible instructor (cap 1) -> sink (cap L_max - pinned load)
+    # Only valid while the model has no side constraints (no timeslots, no hour targets).
+    # Returns None if the final flow cannot place every free section, so the caller can use CP-SAT.
+    # With warm_start, arcs to a section's current instructor are free and all others cost 1,
+    # so the final flow keeps as many existing assignments as the optimal L_max allows.
+    print_header("Solving with Min-Cost Flow")
+    if stats is None:
+        stats = {}
+    start = time.perf_counter()
+    fixed_section_ids = set(fixed_section_ids or [])
+
+    # Pinned sections are assigned up front and only use up their instructor's capacity
+    pinned = {}
+    pinned_load = {}
+    free_sections = []
+    for s in sections:
+        eligible = section_eligibility.get(s["id"]) or []
+        if not eligible:
+            continue
+        current = s.get("instructor_id")
+        if s["id"] in fixed_section_ids and current in eligible:
+            pinned[s["id"]] = current
+            pinned_load[current] = pinned_load.get(current, 0) + 1
+        else:
+            free_sections.append(s)
+
+    instr_ids = sorted({i for s in free_sections for i in section_eligibility[s["id"]]} | set(pinned_load))
+    SOURCE, SINK = 0, 1
+    section_node = {s["id"]: 2 + k for k, s in enumerate(free_sections)}
+    instr_node = {i: 2 + len(free_sections) + k for k, i in enumerate(instr_ids)}
+
+    def run_flow(cap):
+        network = min_cost_flow.SimpleMinCostFlow()
+        section_arcs = []  # (arc, sec_id, instr_id)
+        for s in free_sections:
+            node = section_node[s["id"]]
+            network.add_arc_with_capacity_and_unit_cost(SOURCE, node, 1, 0)
+            for instr_id in section_eligibility[s["id"]]:
+                cost = 0 if not warm_start or instr_id == s.get("instructor_id") else 1
+                arc = network.add_arc_with_capacity_and_unit_cost(node, instr_node[instr_id], 1, cost)
+                section_arcs.append((arc, s["id"], instr_id))
+        for instr_id in instr_ids:
+            remaining = cap - pinned_load.get(instr_id, 0)
+            if remaining > 0:
+                network.add_arc_with_capacity_and_unit_cost(instr_node[instr_id], SINK, remaining, 0)
+        network.set_node_supply(SOURCE, len(free_sections))
+        network.set_node_supply(SINK, -len(free_sections))
+        network.solve_max_flow_with_min_cost()
+        return network, section_arcs
+
+    # smallest L_max at which every free section can be placed; every free section has an eligible
+    # instructor, so stacking all of them on top of the largest pinned load always fits
+    low = max([1 if free_sections else 0] + list(pinned_load.values()))
+    high = len(free_sections) + max(pinned_load.values(), default=0) if free_sections else low
+    iterations = 0
+    while low < high:
+        mid = (low + high) // 2
+        network, _ = run_flow(mid)
+        iterations += 1
+        if network.maximum_flow() == len(free_sections):
+            high = mid
+        else:
+            low = mid + 1
+    l_max = low
+
+    network, section_arcs = run_flow(l_max)
+    if network.maximum_flow() < len(free_sections):
+        # should not happen with the bound above, but never report a partial flow as OPTIMAL
+        print(f"[SOLVER] Flow placed {network.maximum_flow()} of {len(free_sections)} free section(s)")
+        stats["flow_iterations"] = iterations
+        return None
+    chosen = dict(pinned)
+    for arc, sec_id, instr_id in section_arcs:
+        if network.flow(arc) > 0:
+            chosen[sec_id] = instr_id
+
+    assigned_map = {}
+    for s in sections:
+        if not s.get("section_letter") or not s.get("course_id"):
+            continue
+        assigned_map.setdefault(s["scheduled_course_id"], {})[s["section_letter"]] = chosen.get(s["id"])
+
+    if warm_start or fixed_section_ids:
+        hinted = sum(1 for s in free_sections if s.get("instructor_id") in section_eligibility[s["id"]]) if warm_start else 0
+        dropped = sum(1 for s in sections if s.get("instructor_id") and s.get("instructor_id") not in (section_eligibility.get(s["id"]) or []))
+        stats["warm_start"] = {"hinted": hinted, "fixed": len(pinned), "dropped": dropped}
+
+    wall = time.perf_counter() - start
+    assigned_count = len(chosen)
+    stats["engine"] = "flow"
+    stats["status"] = "OPTIMAL"
+    # same objective as the CP-SAT model: L_max * 1000 + total load
+    stats["objective"] = l_max * 1000 + assigned_count
+    stats["best_bound"] = stats["objective"]
+    stats["wall_time_seconds"] = round(wall, 3)
+    stats["flow_iterations"] = iterations
+    stats.setdefault("timings_ms", {})["solve"] = round(wall * 1000, 1)
+    print(f"[SOLVER] Flow engine: L_max={l_max}, {assigned_count} section(s) assigned, {iterations} binary search step(s) in {round(wall, 3)}s")
 
-    print_header("Solver Completed")
     return assigned_map
+
+
+# ------------------------------------------------------------
+# Greedy preview engine
+# ------------------------------------------------------------
+def solve_greedy(sections, section_eligibility, instructor_load, stats=None, fixed_section_ids=None,
+                 section_meetings=None):
+    # Millisecond preview: most constrained sections first (fewest candidates), each to the eligible
+    # instructor with the lowest load so far, ties broken on the load counted from the schedule's
+    # current assignments (count_current_assignments), then on instructor id for a stable answer.
+    # Pinned sections keep their instructor; with meeting times, overlapping candidates are skipped.
+    if stats is None:
+        stats = {}
+    start = time.perf_counter()
+    fixed_section_ids = set(fixed_section_ids or [])
+    section_meetings = section_meetings or {}
+
+    load = {}
+    booked = {}  # instr_id -> [(start, end), ...] when meeting times are known
+    chosen = {}
+
+    def take(sec_id, instr_id):
+        chosen[sec_id] = instr_id
+        load[instr_id] = load.get(instr_id, 0) + 1
+        booked.setdefault(instr_id, []).extend(section_meetings.get(sec_id) or [])
+
+    free = []
+    for s in sections:
+        current = s.get("instructor_id")
+        if s["id"] in fixed_section_ids and current in (section_eligibility.get(s["id"]) or []):
+            take(s["id"], current)
+        else:
+            free.append(s)
+
+    free.sort(key=lambda s: len(section_eligibility.get(s["id"]) or []))
+    for s in free:
+        meetings = section_meetings.get(s["id"]) or []
+        options = [
+            i for i in section_eligibility.get(s["id"]) or []
+            if not any(a < d and c < b for a, b in meetings for c, d in booked.get(i, []))
+        ]
+        if options:
+            take(s["id"], min(options, key=lambda i: (load.get(i, 0), instructor_load.get(i, 0), i)))
+
+    assigned_map = {}
+    for s in sections:
+        if s.get("section_letter") and s.get("course_id"):
+            assigned_map.setdefault(s["scheduled_course_id"], {})[s["section_letter"]] = chosen.get(s["id"])
+
+    l_max = max(load.values(), default=0)
+    unassigned = sum(1 for s in sections if s["id"] not in chosen)
+    wall = time.perf_counter() - start
+    stats["engine"] = "greedy"
+    stats["status"] = "FEASIBLE"
+    stats["objective"] = l_max * 1000 + len(chosen)
+    stats["l_max"] = l_max
+    stats["wall_time_seconds"] = round(wall, 3)
+    stats.setdefault("timings_ms", {})["solve"] = round(wall * 1000, 1)
+    print(f"[SOLVER] Greedy preview: L_max={l_max}, {len(chosen)} assigned, {unassigned} unassigned in {round(wall * 1000, 1)} ms")
+
+    return assigned_map, chosen
+
+
+# solver stats that describe the result itself and are replayed on a cache hit
+CACHED_STATS = (
+    "engine", "status", "objective", "best_bound", "wall_time_seconds",
+    "model_size", "symmetry_breaking", "components", "flow_iterations",
+)
+
+
+def solver_fingerprint(sections, eligibility, instructor_load, instructors, model_kwargs, profile, engine, decompose):
+    # Everything that can change the solver's answer. Current assignments (sections.instructor_id and
+    # the loads counted from them) only matter to warm starts, so without one re-running right after
+    # the previous result was saved still matches.
+    warm = bool(model_kwargs.get("warm_start") or model_kwargs.get("fixed_section_ids"))
+    section_fields = ("id", "scheduled_course_id", "section_letter", "course_id", "term", "timeslots",
+                      "weekly_hours_required") + (("instructor_id",) if warm else ())
+    return fingerprint({
+        "sections": [{f: s.get(f) for f in section_fields} for s in sections],
+        "eligibility": eligibility,
+        "instructor_load": instructor_load if warm else {},
+        "instructors": [{"instructor_id": i["instructor_id"], "cch_target_ay2025": i.get("cch_target_ay2025")}
+                        for i in instructors],
+        "model_kwargs": model_kwargs,
+        "profile": profile,
+        "engine": engine,
+        "decompose": decompose,
+    })
+
+
+def fetch_section_eligibility(sections, instructors, course_ids):
+    qualifications = get_instructor_qualifications(course_ids)
+    unavailable = get_instructor_unavailability([i["instructor_id"] for i in instructors])
+    return build_section_eligibility(sections, instructors, qualifications, unavailable)
+
+
 # ------------------------------------------------------------
 # Public entry point — this is what Flask should call
 # ------------------------------------------------------------
-def solver_main(schedule_id):
+def solver_main(schedule_id, stats=None, save=True, **options):
+    # stats is an optional dict the caller can pass in to collect model/solver details for the response
+    # save=False solves without writing anything back
+    # options are the solve_sections keyword arguments (warm_start, engine, profile, ...)
+    if stats is None:
+        stats = {}
+
     print_header(f"Running Auto-Assign Solver for Schedule {schedule_id}")
 
+    set_phase(stats, "fetching")
     sections = get_sections(schedule_id)
     if not sections:
         print("[SOLVER] No sections found — returning empty result")
@@ -749,18 +1881,626 @@ def solver_main(schedule_id):
         print("[SOLVER] No instructors found — returning empty result")
         return {}
 
+    persist = (lambda result: persist_assignments(schedule_id, sections, result, stats)) if save else None
+    return solve_sections(sections, instructors, stats, persist, **options)
+
+
+def solve_sections(sections, instructors, stats, persist=None, warm_start=False, fixed_section_ids=None, profile=None,
+                   decompose=None, engine="auto", timeslot_aware=False, balance_hours=False, hours_policy=None,
+                   symmetry_breaking=None, use_cache=None, greedy_hint=False, presolve=None):
+    # Solve an already-fetched set of sections (one schedule, or every schedule of a year) and hand
+    # the result to persist(result) when there is one
+    # warm_start reuses the current section assignments as hints; fixed_section_ids pins those sections
+    # profile overrides the CP-SAT search parameters in DEFAULT_SOLVE_PROFILE
+    # decompose solves independent components of the eligibility graph in a process pool (default SOLVER_DECOMPOSE);
+    # it is skipped below SOLVER_DECOMPOSE_MIN_SECTIONS sections and for streamed job solves
+    # engine is "cpsat", "flow", "greedy" or "auto" (flow whenever the model has no side constraints);
+    # greedy is an instant preview that is returned but never saved
+    # greedy_hint seeds CP-SAT with the greedy assignment as solution hints
+    # timeslot_aware forbids giving one instructor two sections whose meeting times overlap
+    # balance_hours adds the weekly-hours / annual-CCH soft targets; hours_policy overrides DEFAULT_HOURS_POLICY
+    # symmetry_breaking collapses interchangeable sections of a course (default SOLVER_SYMMETRY_BREAKING)
+    # use_cache returns the stored result when every solver input is unchanged (default SOLVER_CACHE_ENABLED)
+    # presolve is "report", "strict" or "off" (default SOLVER_PRESOLVE), see presolve_checks
     instructor_load = count_current_assignments(sections)
-    eligibility = build_section_eligibility(sections, instructors)
 
-    model, assignments = create_model(
-        sections, eligibility, instructor_load, instructors
-    )
+    course_ids = {s["course_id"] for s in sections if s.get("course_id")}
+    eligibility = fetch_section_eligibility(sections, instructors, course_ids)
+
+    # Report how much smaller the sparse model is than the full section x instructor grid
+    variable_count = sum(len(v) for v in eligibility.values())
+    dense_count = len(sections) * len(instructors)
+    stats["dense_variable_count"] = dense_count
+    stats["variable_count"] = variable_count
+    stats["variable_reduction"] = dense_count - variable_count
+    stats["variable_reduction_pct"] = round(100 * (dense_count - variable_count) / dense_count, 1) if dense_count else 0
+    print(f"[SOLVER] {variable_count} assignment variables (dense grid would be {dense_count})")
+
+    profile = build_solve_profile(profile)
+    if decompose is None:
+        decompose = SOLVER_DECOMPOSE
+
+    model_kwargs = {
+        "warm_start": warm_start,
+        "fixed_section_ids": fixed_section_ids,
+        "symmetry_breaking": symmetry_breaking,
+    }
 
-    result = solve_and_save(sections, assignments, model)
+    # Model features the flow engine cannot express; each one forces CP-SAT
+    side_constraints = []
+
+    if timeslot_aware:
+        section_meetings = get_section_meetings(sections)
+        if section_meetings:
+            model_kwargs["section_meetings"] = section_meetings
+            side_constraints.append("timeslot_overlap")
+
+    if balance_hours:
+        hours_policy = build_hours_policy(hours_policy)
+        section_hours = compute_section_hours(sections, get_course_hours(course_ids))
+        model_kwargs["section_hours"] = section_hours
+        model_kwargs["hours_policy"] = hours_policy
+        stats["hours_policy"] = hours_policy
+        side_constraints.append("contact_hours")
+
+    if presolve is None:
+        presolve = SOLVER_PRESOLVE
+    if presolve != "off":
+        set_phase(stats, "checking")
+        # the hours capacity check runs in every mode, so fetch the hours here when the model did not need them
+        presolve_hours = model_kwargs.get("section_hours")
+        if presolve_hours is None:
+            presolve_hours = compute_section_hours(sections, get_course_hours(course_ids))
+        stats["presolve"] = presolve_checks(
+            sections, eligibility, instructors, model_kwargs.get("section_meetings"),
+            presolve_hours, model_kwargs.get("hours_policy") or build_hours_policy(hours_policy),
+            strict=presolve == "strict"
+        )
+        if not stats["presolve"]["feasible"]:
+            print("[SOLVER] Pre-solve checks failed — skipping the solve")
+            stats["status"] = "PRESOLVE_FAILED"
+            set_phase(stats, "done")
+            return {}
+
+    if engine == "greedy":
+        set_phase(stats, "solving")
+        result, _ = solve_greedy(sections, eligibility, instructor_load, stats, fixed_section_ids,
+                                 model_kwargs.get("section_meetings"))
+        stats["preview"] = True
+        set_phase(stats, "done")
+        return result
+
+    if engine == "auto":
+        engine = "cpsat" if side_constraints else "flow"
+    elif engine == "flow" and side_constraints:
+        print(f"[SOLVER] Flow engine cannot handle {side_constraints} — falling back to CP-SAT")
+        engine = "cpsat"
+    stats["engine"] = engine
+    print(f"[SOLVER] Engine: {engine}")
+
+    if greedy_hint and engine == "cpsat":
+        _, model_kwargs["section_hints"] = solve_greedy(
+            sections, eligibility, instructor_load, {}, fixed_section_ids, model_kwargs.get("section_meetings")
+        )
+
+    components = find_eligibility_components(sections, eligibility)
+    stats["component_count"] = len(components)
+    print(f"[SOLVER] Eligibility graph has {len(components)} independent component(s)")
+
+    if decompose and len(components) > 1:
+        if stats.get("streamed"):
+            # component processes cannot stream incumbents back or see an accepted incumbent
+            print("[SOLVER] Streamed job — solving all components in one model")
+            decompose = False
+        elif len(sections) < SOLVER_DECOMPOSE_MIN_SECTIONS:
+            print(f"[SOLVER] {len(sections)} sections is below SOLVER_DECOMPOSE_MIN_SECTIONS — solving in one model")
+            decompose = False
+    stats["decomposed"] = bool(decompose and len(components) > 1)
+
+    if use_cache is None:
+        use_cache = SOLVER_CACHE_ENABLED
+    cached = cache_key = None
+    if use_cache:
+        lookup_start = time.perf_counter()
+        cache_key = solver_fingerprint(
+            sections, eligibility, instructor_load, instructors, model_kwargs, profile, engine, decompose
+        )
+        cached = load_cached_result(cache_key)
+        stats.setdefault("timings_ms", {})["cache_lookup"] = round((time.perf_counter() - lookup_start) * 1000, 1)
+        stats["cache"] = "hit" if cached else "miss"
+        print(f"[CACHE] {stats['cache']} for {cache_key[:12]}")
+
+    # keep a handle on the monolithic model so it can be cached with the result
+    model = None
+    result = None
+    if cached:
+        # the stored map is already what the solver would return; persisting only writes what has drifted
+        stats.update(cached["stats"])
+        result = cached["result"]
+    elif engine == "flow":
+        set_phase(stats, "solving")
+        result = solve_flow(sections, eligibility, stats, warm_start=warm_start, fixed_section_ids=fixed_section_ids)
+        if result is None:
+            print("[SOLVER] Flow engine left sections unplaced — falling back to CP-SAT")
+            stats["engine"] = "cpsat"
+    elif decompose and len(components) > 1:
+        set_phase(stats, "solving")
+        result = solve_components_parallel(
+            components, eligibility, instructor_load, instructors, stats, profile, model_kwargs
+        )
+        if result:
+            # sections nobody can teach are still reported, just without an instructor
+            for s in sections:
+                if not eligibility.get(s["id"]) and s.get("section_letter") and s.get("course_id"):
+                    result.setdefault(s["scheduled_course_id"], {})[s["section_letter"]] = None
+
+    if result is None:
+        set_phase(stats, "building")
+        model, assignments, section_vars = create_model(
+            sections, eligibility, instructor_load, instructors, stats, **model_kwargs
+        )
+
+        set_phase(stats, "solving")
+        result = solve_model(sections, section_vars, model, stats, profile)
+
+    if result and persist:
+        set_phase(stats, "saving")
+        persist(result)
+
+    if cache_key and not cached and result:
+        store_result(cache_key, result, {k: stats[k] for k in CACHED_STATS if k in stats}, model)
+    set_phase(stats, "done")
+
+    # L_max is a max over instructors and components share no instructors,
+    # so the schedule-wide L_max is the largest per-component value
+    final_load = {}
+    for letters in result.values():
+        for instr_id in letters.values():
+            if instr_id:
+                final_load[instr_id] = final_load.get(instr_id, 0) + 1
+    stats["l_max"] = max(final_load.values(), default=0)
+
+    if balance_hours and result:
+        eligible_ids = {i for ids in eligibility.values() for i in ids}
+        stats["hours_deviation"] = hours_deviation_report(
+            sections, result, model_kwargs["section_hours"], instructors, eligible_ids, hours_policy
+        )
 
     if not result:
         print("[SOLVER] No assignment results — returning {}")
+    elif "warm_start" in stats:
+        # how many of the existing assignments survived the re-solve
+        kept = sum(
+            1 for s in sections
+            if s.get("instructor_id")
+            and result.get(s.get("scheduled_course_id"), {}).get(s.get("section_letter")) == s["instructor_id"]
+        )
+        stats["warm_start"]["kept"] = kept
+        print(f"[SOLVER] Kept {kept} existing assignment(s)")
+
+    return result
+
+
+# ------------------------------------------------------------
+# Academic-year mode: every schedule of a year solved as one model
+# ------------------------------------------------------------
+def get_year_schedule_ids(academic_year):
+    print_header(f"Fetching Schedules for Academic Year {academic_year}")
+    response = (
+        supabase_client.table("schedules")
+        .select("id")
+        .eq("academic_year", academic_year)
+        .execute()
+    )
+    schedule_ids = [row["id"] for row in response.data or []]
+    print(f"Found {len(schedule_ids)} schedule(s)")
+    return schedule_ids
+
+
+def get_sections_for_schedules(schedule_ids):
+    print_header(f"Fetching Sections for {len(schedule_ids)} Schedule(s)")
+    if not schedule_ids:
+        return []
+
+    # bulk queries for the whole year instead of one per schedule, paged because PostgREST caps a
+    # response at its max-rows limit without an error; id breaks ties so pages never overlap
+    sections = []
+    while True:
+        page = (
+            supabase_client.table("sections")
+            .select("*")
+            .in_("schedule_id", list(schedule_ids))
+            .order("schedule_id")
+            .order("course_id")
+            .order("section_letter")
+            .order("id")
+            .range(len(sections), len(sections) + SECTIONS_PAGE_SIZE - 1)
+            .execute()
+        ).data or []
+        sections.extend(page)
+        if len(page) < SECTIONS_PAGE_SIZE:
+            break
+    print(f"Found {len(sections)} sections")
+    return sections
+
+
+def persist_schedules(sections, assigned_map, stats):
+    # write the joint result back one schedule at a time (each in a constant number of round trips)
+    by_schedule = {}
+    for s in sections:
+        by_schedule.setdefault(s["schedule_id"], []).append(s)
+
+    for schedule_id, schedule_sections in by_schedule.items():
+        scids = {s.get("scheduled_course_id") for s in schedule_sections}
+        schedule_map = {scid: letters for scid, letters in assigned_map.items() if scid in scids}
+        schedule_stats = stats["schedules"].setdefault(schedule_id, {"sections": len(schedule_sections)})
+        persist_assignments(schedule_id, schedule_sections, schedule_map, schedule_stats)
+
+
+def year_solver_main(academic_year, stats=None, save=True, compare_separate=False, **options):
+    # Joint auto-assign for every schedule of an academic year. Instructors are shared between
+    # programs, so one model over all sections balances each instructor's load across schedules
+    # instead of filling whoever the first schedule solved happens to pick.
+    # compare_separate also runs the old one-schedule-at-a-time solve (without saving) and reports both.
+    if stats is None:
+        stats = {}
+
+    print_header(f"Running Year-Wide Auto-Assign Solver for {academic_year}")
+    year_start = time.perf_counter()
+
+    set_phase(stats, "fetching")
+    schedule_ids = get_year_schedule_ids(academic_year)
+    sections = get_sections_for_schedules(schedule_ids)
+    if not sections:
+        print("[SOLVER] No sections found — returning empty result")
+        return {}
+
+    instructors = get_active_instructors()
+    if not instructors:
+        print("[SOLVER] No instructors found — returning empty result")
+        return {}
+
+    stats["schedules"] = {}
+    persist = (lambda result: persist_schedules(sections, result, stats)) if save else None
+    result = solve_sections(sections, instructors, stats, persist, **options)
+
+    stats["schedule_count"] = len(schedule_ids)
+    stats["wall_seconds"] = round(time.perf_counter() - year_start, 3)
+    print(f"[TIMING] Joint solve of {len(schedule_ids)} schedule(s) took {stats['wall_seconds']}s")
+
+    if compare_separate:
+        stats["separate"] = compare_separate_solves(schedule_ids, options)
+        print(f"[SOLVER] Separate solves took {stats['separate']['wall_seconds']}s, "
+              f"max instructor load {stats['separate']['l_max']} (joint {stats['l_max']})")
+
+    return result
+
+
+def compare_separate_solves(schedule_ids, options):
+    # The per-schedule baseline: solver_main once per schedule, fetches included, nothing saved
+    # and no cache. Loads are added up across schedules to show who ends up overloaded.
+    options = dict(options, use_cache=False)
+    start = time.perf_counter()
+    load = {}
+    per_schedule = {}
+    for schedule_id in schedule_ids:
+        schedule_stats = {}
+        result = solver_main(schedule_id, stats=schedule_stats, save=False, **options)
+        for letters in result.values():
+            for instr_id in letters.values():
+                if instr_id:
+                    load[instr_id] = load.get(instr_id, 0) + 1
+        per_schedule[schedule_id] = {"status": schedule_stats.get("status"), "l_max": schedule_stats.get("l_max")}
+
+    return {
+        "wall_seconds": round(time.perf_counter() - start, 3),
+        "l_max": max(load.values(), default=0),
+        "schedules": per_schedule,
+    }
+
+
+# ------------------------------------------------------------
+# What-if scenarios: solve variants of one schedule side by side, nothing saved
+# ------------------------------------------------------------
+def solve_scenario(payload):
+    # Runs in a worker process: solve one scenario from prepared data, no database access
+    stats = {}
+    start = time.perf_counter()
+    sections, eligibility = payload["sections"], payload["eligibility"]
+    model_kwargs = payload["model_kwargs"]
+
+    if payload["engine"] == "greedy":
+        result, _ = solve_greedy(sections, eligibility, payload["instructor_load"], stats,
+                                 model_kwargs.get("fixed_section_ids"), model_kwargs.get("section_meetings"))
+    elif payload["engine"] == "flow":
+        result = solve_flow(sections, eligibility, stats, warm_start=model_kwargs.get("warm_start"),
+                            fixed_section_ids=model_kwargs.get("fixed_section_ids"))
+    else:
+        model, assignments, section_vars = create_model(
+            sections, eligibility, payload["instructor_load"], payload["instructors"], stats, **model_kwargs
+        )
+        result = solve_model(sections, section_vars, model, stats, payload["profile"])
+
+    stats["wall_seconds"] = round(time.perf_counter() - start, 3)
+    return result, stats
+
+
+def evaluate_scenarios(schedule_id, scenarios, stats=None, warm_start=True, fixed_section_ids=None, profile=None,
+                       engine="auto", timeslot_aware=False, balance_hours=False, hours_policy=None,
+                       symmetry_breaking=None):
+    # Each scenario is a delta against the schedule as it is now:
+    #   {"name", "add_sections": [{"course_id", "term", "weekly_hours_required", "timeslots", ...}],
+    #    "remove_section_ids", "remove_instructor_ids", "fixed_section_ids",
+    #    "balance_hours", "hours_policy", "profile"}
+    # The schedule's data is fetched once, every variant (plus an unchanged baseline) is solved in a
+    # process pool, and a comparison row per scenario is returned with its assignment. Nothing is saved;
+    # apply_scenario writes the one the AC picks.
+    # warm_start (the default) starts every scenario from the current assignment and breaks ties in favour
+    # of keeping it, so "changed" counts moves the scenario needs rather than arbitrary reshuffles.
+    if stats is None:
+        stats = {}
+    print_header(f"Evaluating {len(scenarios)} Scenario(s) for Schedule {schedule_id}")
+    batch_start = time.perf_counter()
+
+    set_phase(stats, "fetching")
+    sections = get_sections(schedule_id)
+    instructors = get_active_instructors()
+    if not sections or not instructors:
+        print("[SOLVER] No sections or instructors — nothing to compare")
+        return []
+
+    scenarios = [{"name": "baseline"}] + list(scenarios)
+
+    # new sections get ids that are unique across the batch so the shared lookups below cover them all
+    added = {}
+    for n, scenario in enumerate(scenarios):
+        added[n] = []
+        for k, extra in enumerate(scenario.get("add_sections") or []):
+            new_id = f"scenario{n}-new{k}"
+            added[n].append({
+                "id": new_id,
+                "schedule_id": schedule_id,
+                "scheduled_course_id": extra.get("scheduled_course_id") or new_id,
+                "section_letter": extra.get("section_letter") or "A",
+                "course_id": extra["course_id"],
+                "term": extra.get("term"),
+                "delivery_mode": extra.get("delivery_mode"),
+                "timeslots": extra.get("timeslots") or [],
+                "weekly_hours_required": extra.get("weekly_hours_required"),
+                "instructor_id": None,
+            })
+    all_sections = sections + [sec for extra in added.values() for sec in extra]
+
+    # one fetch of every lookup table for the union of all scenarios
+    course_ids = {s["course_id"] for s in all_sections if s.get("course_id")}
+    qualifications = get_instructor_qualifications(course_ids)
+    unavailable = get_instructor_unavailability([i["instructor_id"] for i in instructors])
+    section_meetings = get_section_meetings(all_sections) if timeslot_aware else {}
+    needs_hours = balance_hours or any(sc.get("balance_hours") or sc.get("hours_policy") for sc in scenarios)
+    section_hours = compute_section_hours(all_sections, get_course_hours(course_ids)) if needs_hours else {}
+
+    base_profile = build_solve_profile(profile)
+    payloads = []
+    for n, scenario in enumerate(scenarios):
+        removed_sections = set(scenario.get("remove_section_ids") or [])
+        removed_instructors = set(scenario.get("remove_instructor_ids") or [])
+        scenario_sections = [s for s in sections if s["id"] not in removed_sections] + added[n]
+        scenario_instructors = [i for i in instructors if i["instructor_id"] not in removed_instructors]
+        eligibility = build_section_eligibility(scenario_sections, scenario_instructors, qualifications, unavailable)
+
+        scenario_ids = {s["id"] for s in scenario_sections}
+        model_kwargs = {
+            "warm_start": warm_start,
+            "fixed_section_ids": list(set(fixed_section_ids or []) | set(scenario.get("fixed_section_ids") or [])),
+            "symmetry_breaking": symmetry_breaking,
+            # tie-break only: one move costs less than any change in L_max (weight 1000)
+            "move_weight": SCENARIO_MOVE_WEIGHT if warm_start else 0,
+        }
+        side_constraints = []
+        if section_meetings:
+            model_kwargs["section_meetings"] = {k: v for k, v in section_meetings.items() if k in scenario_ids}
+            side_constraints.append("timeslot_overlap")
+        if balance_hours or scenario.get("balance_hours") or scenario.get("hours_policy"):
+            model_kwargs["section_hours"] = {k: v for k, v in section_hours.items() if k in scenario_ids}
+            model_kwargs["hours_policy"] = build_hours_policy(dict(hours_policy or {}, **(scenario.get("hours_policy") or {})))
+            side_constraints.append("contact_hours")
+
+        scenario_engine = engine
+        if engine == "auto" or (engine == "flow" and side_constraints):
+            scenario_engine = "cpsat" if side_constraints else "flow"
+
+        payloads.append({
+            "sections": scenario_sections,
+            "eligibility": eligibility,
+            "instructor_load": count_current_assignments(scenario_sections),
+            "instructors": scenario_instructors,
+            "profile": build_solve_profile(dict(base_profile, **(scenario.get("profile") or {}))),
+            "model_kwargs": model_kwargs,
+            "engine": scenario_engine,
+        })
+
+    set_phase(stats, "solving")
+    pool_size = max(1, min(len(payloads), os.cpu_count() or 1, SOLVER_MAX_PROCESSES))
+    for payload in payloads:
+        # split the CP-SAT search workers between the processes running at the same time
+        payload["profile"]["num_workers"] = max(1, payload["profile"]["num_workers"] // pool_size)
+    try:
+        # the same warm pool as decomposed solves, so a batch does not start its own processes
+        results = list(get_component_pool().map(solve_scenario, payloads))
+    except BrokenProcessPool:
+        reset_component_pool()
+        raise
+
+    rows = []
+    for scenario, payload, (result, scenario_stats) in zip(scenarios, payloads, results):
+        load = {}
+        changed = unassigned = 0
+        for s in payload["sections"]:
+            instr_id = result.get(s.get("scheduled_course_id"), {}).get(s.get("section_letter"))
+            if instr_id:
+                load[instr_id] = load.get(instr_id, 0) + 1
+            else:
+                unassigned += 1
+            if s.get("instructor_id") and instr_id != s["instructor_id"]:
+                changed += 1
+
+        rows.append({
+            "name": scenario.get("name"),
+            "engine": payload["engine"],
+            "status": scenario_stats.get("status"),
+            "objective": scenario_stats.get("objective"),
+            "l_max": max(load.values(), default=0),
+            "changed_assignments": changed,
+            "unassigned_sections": unassigned,
+            "wall_seconds": scenario_stats.get("wall_seconds"),
+            "assigned_map": result,
+        })
+        print(f"[SCENARIO] {scenario.get('name')}: {rows[-1]['status']} objective={rows[-1]['objective']} "
+              f"L_max={rows[-1]['l_max']} changed={changed}")
+
+    set_phase(stats, "done")
+    stats["scenario_count"] = len(rows)
+    stats["wall_seconds"] = round(time.perf_counter() - batch_start, 3)
+    stats["pool_size"] = pool_size
+    return rows
+
+
+def apply_scenario(schedule_id, assigned_map, stats=None):
+    # Save the assignment of the scenario the AC picked. Only sections that exist in the schedule are
+    # written; sections a scenario added hypothetically have to be created through the normal flow first.
+    sections = get_sections(schedule_id)
+    existing = {(s.get("scheduled_course_id"), s.get("section_letter")) for s in sections}
+    result = {}
+    for scid, letters in (assigned_map or {}).items():
+        for letter, instr_id in (letters or {}).items():
+            if (scid, letter) in existing:
+                result.setdefault(scid, {})[letter] = instr_id
+
+    persist_assignments(schedule_id, sections, result, stats)
+    return result
+
+
+# ------------------------------------------------------------
+# Local repair: re-solve only the neighbourhood of a change
+# ------------------------------------------------------------
+def find_repair_neighbourhood(sections, eligibility, changed_instructor_ids=None, changed_section_ids=None,
+                              ring=1, max_free=None):
+    # Seeds are the sections the change touches directly: the requested sections, sections held by a
+    # changed instructor, sections without an instructor, and sections whose instructor is no longer
+    # eligible (inactive, unqualified or now unavailable). Each ring then adds the sections held by
+    # the seeds' candidate instructors, busiest holders first, so the solver has room to swap.
+    # Returns the ids of the sections to free, at most max_free of them (seeds are always kept).
+    if max_free is None:
+        max_free = SOLVER_REPAIR_MAX_FREE_SECTIONS
+    changed_instructor_ids = set(changed_instructor_ids or [])
+    changed_section_ids = set(changed_section_ids or [])
+
+    held_by = {}
+    for s in sections:
+        if s.get("instructor_id"):
+            held_by.setdefault(s["instructor_id"], []).append(s)
+
+    freed = []
+    for s in sections:
+        current = s.get("instructor_id")
+        if (s["id"] in changed_section_ids or current in changed_instructor_ids
+                or not current or current not in eligibility.get(s["id"], [])):
+            freed.append(s["id"])
+    freed_set = set(freed)
+
+    frontier = {i for sec_id in freed for i in eligibility.get(sec_id, [])} | changed_instructor_ids
+    for _ in range(ring):
+        # only sections that someone else could take are worth freeing
+        candidates = [
+            s for instr_id in sorted(frontier, key=lambda i: -len(held_by.get(i, [])))
+            for s in held_by.get(instr_id, [])
+            if s["id"] not in freed_set and len(eligibility.get(s["id"], [])) > 1
+        ]
+        added = []
+        for s in candidates:
+            if len(freed) >= max_free:
+                break
+            if s["id"] not in freed_set:
+                freed.append(s["id"])
+                freed_set.add(s["id"])
+                added.append(s["id"])
+        if not added:
+            break
+        frontier = {i for sec_id in added for i in eligibility.get(sec_id, [])} - frontier
+
+    return freed
+
+
+def repair_main(schedule_id, changed_instructor_ids=None, changed_section_ids=None, ring=1, max_free=None,
+                stats=None, save=True, profile=None):
+    # Re-solve only the sections around a change (see find_repair_neighbourhood) with every other
+    # assignment fixed, and penalise moving an existing assignment so as little as possible changes.
+    # The fixed sections enter the small model only as each instructor's base load.
+    if stats is None:
+        stats = {}
+    repair_start = time.perf_counter()
+    print_header(f"Repairing Schedule {schedule_id}")
+
+    set_phase(stats, "fetching")
+    sections = get_sections(schedule_id)
+    instructors = get_active_instructors()
+    if not sections or not instructors:
+        print("[SOLVER] Nothing to repair — returning empty result")
+        return {}
+
+    course_ids = {s["course_id"] for s in sections if s.get("course_id")}
+    eligibility = fetch_section_eligibility(sections, instructors, course_ids)
+
+    freed_ids = set(find_repair_neighbourhood(
+        sections, eligibility, changed_instructor_ids, changed_section_ids, ring, max_free
+    ))
+    freed = [s for s in sections if s["id"] in freed_ids]
+    fixed = [s for s in sections if s["id"] not in freed_ids]
+
+    base_load = count_current_assignments(fixed)
+    candidate_ids = {i for s in freed for i in eligibility.get(s["id"], [])}
+    candidates = [i for i in instructors if i["instructor_id"] in candidate_ids]
+    print(f"[REPAIR] Freed {len(freed)} of {len(sections)} section(s) across {len(candidates)} candidate instructor(s)")
+
+    stats["repair"] = {"freed_sections": len(freed), "fixed_sections": len(fixed), "candidate_instructors": len(candidates)}
+    stats["engine"] = "cpsat"
+
+    # everything outside the neighbourhood keeps its current instructor
+    result = {}
+    for s in fixed:
+        if s.get("section_letter") and s.get("course_id"):
+            result.setdefault(s["scheduled_course_id"], {})[s["section_letter"]] = s.get("instructor_id")
+
+    if freed:
+        set_phase(stats, "building")
+        model, assignments, section_vars = create_model(
+            freed, {s["id"]: eligibility.get(s["id"], []) for s in freed}, {}, candidates, stats,
+            symmetry_breaking=False, base_load=base_load, move_weight=SOLVER_REPAIR_MOVE_WEIGHT
+        )
+
+        set_phase(stats, "solving")
+        repair_profile = build_solve_profile(dict({"max_time_seconds": SOLVER_REPAIR_MAX_TIME_SECONDS}, **(profile or {})))
+        freed_map = solve_model(freed, section_vars, model, stats, repair_profile)
+        if not freed_map:
+            set_phase(stats, "done")
+            return {}
+
+        for scid, letters in freed_map.items():
+            result.setdefault(scid, {}).update(letters)
+
+        moved = sum(
+            1 for s in freed
+            if s.get("instructor_id") and freed_map.get(s["scheduled_course_id"], {}).get(s["section_letter"]) != s["instructor_id"]
+        )
+        stats["repair"]["moved"] = moved
+        print(f"[REPAIR] {moved} existing assignment(s) moved")
+
+    if save:
+        set_phase(stats, "saving")
+        persist_assignments(schedule_id, sections, result, stats)
+    set_phase(stats, "done")
 
+    stats["repair"]["wall_seconds"] = round(time.perf_counter() - repair_start, 3)
     return result
 
 
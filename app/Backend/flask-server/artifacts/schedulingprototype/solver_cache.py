@@ -0,0 +1,110 @@
+# On-disk cache of auto-assign results.
+# Entries are keyed by a fingerprint of every solver input (sections, eligibility, loads, options),
+# so pressing auto-assign again on unchanged data skips the model build and the solve, and any
+# change to the inputs gives a new key. Old entries are evicted least-recently-used first.
+import hashlib
+import json
+import os
+import tempfile
+import threading
+import time
+
+SOLVER_CACHE_ENABLED = os.getenv("SOLVER_CACHE_ENABLED", "true").lower() == "true"
+SOLVER_CACHE_DIR = os.getenv("SOLVER_CACHE_DIR", os.path.join(tempfile.gettempdir(), "sadt_solver_cache"))
+SOLVER_CACHE_MAX_ENTRIES = int(os.getenv("SOLVER_CACHE_MAX_ENTRIES", "50"))
+
+# bump when the model changes in a way that makes earlier results stale
+SOLVER_CACHE_VERSION = 1
+
+_lock = threading.Lock()
+
+
+def fingerprint(inputs):
+    # sha256 over a canonical JSON dump: key order and set order do not change the key
+    def canonical(value):
+        if isinstance(value, dict):
+            return {str(k): canonical(v) for k, v in value.items()}
+        if isinstance(value, (set, frozenset)):
+            return sorted((canonical(v) for v in value), key=repr)
+        if isinstance(value, (list, tuple)):
+            return [canonical(v) for v in value]
+        return value
+
+    payload = json.dumps({"version": SOLVER_CACHE_VERSION, "inputs": canonical(inputs)}, sort_keys=True, default=str)
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+
+def _entry_paths(key):
+    return os.path.join(SOLVER_CACHE_DIR, f"{key}.json"), os.path.join(SOLVER_CACHE_DIR, f"{key}.pb")
+
+
+def load_cached_result(key):
+    """
+    Return the cached entry {"result", "stats", "created_at"} for a fingerprint, or None.
+    A hit refreshes the entry's modification time, which is what LRU eviction sorts on.
+    """
+    result_path, _ = _entry_paths(key)
+    try:
+        with open(result_path, "r", encoding="utf-8") as f:
+            entry = json.load(f)
+        os.utime(result_path)
+    except (OSError, ValueError):
+        return None
+    return entry
+
+
+def store_result(key, result, stats, model=None):
+    """
+    Save a solve result (and the serialized CpModelProto when there is a single model) under a fingerprint,
+    then evict the least recently used entries beyond SOLVER_CACHE_MAX_ENTRIES.
+    """
+    result_path, model_path = _entry_paths(key)
+    entry = {"result": result, "stats": stats, "created_at": time.time()}
+
+    try:
+        os.makedirs(SOLVER_CACHE_DIR, exist_ok=True)
+        # write to a temp file and rename so a concurrent reader never sees half an entry
+        if model is not None:
+            _write_atomic(model_path, lambda path: model.ExportToFile(path))
+
+        def write_entry(path):
+            with open(path, "w", encoding="utf-8") as f:
+                json.dump(entry, f, default=str)
+
+        _write_atomic(result_path, write_entry)
+    except OSError as e:
+        print(f"[CACHE] Could not write cache entry {key}: {e}")
+        return
+
+    with _lock:
+        _evict()
+
+
+def _write_atomic(path, write):
+    # write(tmp_path) fills a temp file next to the target, which is then renamed into place
+    fd, tmp_path = tempfile.mkstemp(dir=SOLVER_CACHE_DIR, suffix=".tmp")
+    os.close(fd)
+    try:
+        write(tmp_path)
+        os.replace(tmp_path, path)
+    except OSError:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+        raise
+
+
+def _evict():
+    try:
+        entries = [e for e in os.scandir(SOLVER_CACHE_DIR) if e.name.endswith(".json")]
+    except OSError:
+        return
+
+    entries.sort(key=lambda e: e.stat().st_mtime)
+    for entry in entries[:max(0, len(entries) - SOLVER_CACHE_MAX_ENTRIES)]:
+        key = entry.name[:-len(".json")]
+        for path in _entry_paths(key):
+            try:
+                os.remove(path)
+            except OSError:
+                pass
+        print(f"[CACHE] Evicted {key}")
@@ -0,0 +1,266 @@
+# Background auto-assign jobs.
+# The solve runs on a small local worker pool so the HTTP request can return a job id right away
+# and the frontend polls for progress instead of holding a connection open for the whole solve.
+# With SOLVER_WORKER_PROCESSES > 0 the solve itself happens in a persistent worker process
+# (solver_workers) and the job's stats are kept up to date from its progress snapshots.
+import json
+import os
+import threading
+import time
+import traceback
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+
+from artifacts.schedulingprototype.scheduling import solver_main, year_solver_main
+from artifacts.schedulingprototype.solver_workers import SOLVER_WORKER_PROCESSES, request_stop, submit_to_worker
+
+SOLVER_JOB_WORKERS = int(os.getenv("SOLVER_JOB_WORKERS", "2"))
+MAX_FINISHED_JOBS = 100  # finished jobs kept around so late polls still get their result
+
+_executor = ThreadPoolExecutor(max_workers=SOLVER_JOB_WORKERS, thread_name_prefix="auto-assign")
+_lock = threading.Lock()
+_jobs = {}                # job_id -> job dict
+_running_by_key = {}      # (target, target id) -> job_id of the queued/running job that will write it
+
+# what a job solves: one schedule, or every schedule of an academic year in one model
+SOLVERS = {"schedule": solver_main, "academic_year": year_solver_main}
+
+
+def _run_job(job, solver_kwargs):
+    job["status"] = "running"
+    job["started_at"] = time.time()
+    try:
+        job["assigned_map"] = SOLVERS[job["target"]](job["target_id"], stats=job["solver_stats"], **solver_kwargs)
+        job["status"] = "completed"
+    except Exception as e:
+        print(f"[AUTO ASSIGN JOB] Job {job['job_id']} crashed: {e}")
+        print(traceback.format_exc())
+        job["status"] = "failed"
+        job["error"] = str(e)
+    finally:
+        _finish_job(job)
+
+
+def _on_worker_event(job, kind, payload):
+    # called from the worker listener thread for a job running in a solver process
+    if kind == "started":
+        job["status"] = "running"
+        job["started_at"] = time.time()
+        if job["solver_stats"].get("stop_requested"):
+            request_stop(job["job_id"])
+    elif kind == "progress":
+        job["solver_stats"].update(payload)
+    elif kind in ("completed", "failed"):
+        job["solver_stats"].update(payload.get("solver_stats") or {})
+        if kind == "completed":
+            job["assigned_map"] = payload["assigned_map"]
+        else:
+            print(f"[AUTO ASSIGN JOB] Job {job['job_id']} failed in its worker: {payload['error']}")
+            job["error"] = payload["error"]
+        job["status"] = kind
+        if not job["started_at"]:
+            job["started_at"] = time.time()
+        _finish_job(job)
+
+
+def _finish_job(job):
+    job["finished_at"] = time.time()
+    # the result is in assigned_map now; a leftover incumbent from the last progress snapshot would be stale
+    job["solver_stats"].pop("incumbent", None)
+    with _lock:
+        if job["dedupe_key"] and _running_by_key.get(job["dedupe_key"]) == job["job_id"]:
+            del _running_by_key[job["dedupe_key"]]
+        _trim_finished_jobs()
+    job["done"].set()
+
+
+def _trim_finished_jobs():
+    finished = [j for j in _jobs.values() if j.get("finished_at")]
+    finished.sort(key=lambda j: j["finished_at"])
+    for job in finished[:max(0, len(finished) - MAX_FINISHED_JOBS)]:
+        del _jobs[job["job_id"]]
+
+
+class JobConflict(Exception):
+    # another job is already writing the same schedule(s) with different options; .job is that job
+    def __init__(self, job):
+        super().__init__(f"Job {job['job_id']} is already auto-assigning with different options")
+        self.job = job
+
+
+def _options_key(solver_kwargs):
+    # canonical form of the solver options, so equal requests dedupe whatever their key order
+    return json.dumps(solver_kwargs, sort_keys=True, default=str)
+
+
+def _submit(target, target_id, streamed, solver_kwargs):
+    # queue a job for SOLVERS[target](target_id, **solver_kwargs), or return the one already queued
+    label = f"{target.replace('_', ' ')} {target_id}"
+    options_key = _options_key(solver_kwargs)
+    # Every job diffs and writes sections from its own snapshot, so only one job may write a schedule
+    # at a time. Greedy previews and save=False solves write nothing and are never blocked.
+    writes = solver_kwargs.get("save", True) and solver_kwargs.get("engine") != "greedy"
+    dedupe_key = (target, target_id) if writes else None
+    with _lock:
+        existing_id = _running_by_key.get(dedupe_key) if writes else None
+        if writes and not existing_id:
+            # a year job writes every schedule of its year, so it never runs next to a per-schedule job
+            existing_id = next((job_id for (other, _), job_id in _running_by_key.items() if other != target), None)
+        if existing_id:
+            existing = _jobs[existing_id]
+            if existing["dedupe_key"] != dedupe_key or existing["options_key"] != options_key:
+                print(f"[AUTO ASSIGN JOB] {label} conflicts with running job {existing_id}")
+                raise JobConflict(existing)
+            print(f"[AUTO ASSIGN JOB] {label} already has job {existing_id} with these options — attaching")
+            return existing, True
+
+        job = {
+            "job_id": str(uuid.uuid4()),
+            "target": target,
+            "target_id": target_id,
+            "schedule_id": target_id if target == "schedule" else None,
+            "academic_year": target_id if target == "academic_year" else None,
+            "dedupe_key": dedupe_key,
+            "options_key": options_key,
+            "status": "queued",
+            "submitted_at": time.time(),
+            "started_at": None,
+            "finished_at": None,
+            "solver_stats": {"phase": "queued", "streamed": streamed},
+            "assigned_map": None,
+            "error": None,
+            "done": threading.Event(),
+        }
+        _jobs[job["job_id"]] = job
+        if dedupe_key:
+            _running_by_key[dedupe_key] = job["job_id"]
+
+    if solver_kwargs.get("engine") == "greedy":
+        print(f"[AUTO ASSIGN JOB] Running greedy preview {job['job_id']} for {label} inline")
+        _run_job(job, solver_kwargs)
+        return job, False
+
+    print(f"[AUTO ASSIGN JOB] Queued job {job['job_id']} for {label}")
+    if SOLVER_WORKER_PROCESSES > 0:
+        submit_to_worker(job["job_id"], target, target_id, solver_kwargs,
+                         lambda kind, payload: _on_worker_event(job, kind, payload), streamed)
+    else:
+        _executor.submit(_run_job, job, solver_kwargs)
+    return job, False
+
+
+def submit_auto_assign(schedule_id, streamed=True, **solver_kwargs):
+    """
+    Queue an auto-assign solve for a schedule.
+    streamed marks a job whose progress is polled or streamed and whose incumbent can be accepted;
+    such a solve stays in one model, so only unstreamed solves can decompose (see solve_sections).
+    A schedule has at most one queued or running job: a request with the same options gets the existing
+    job back, one with different options raises JobConflict. Greedy previews take milliseconds and save
+    nothing, so they run inline, come back finished and are never blocked.
+    Returns (job, attached) where attached is True when an existing job was reused.
+    """
+    return _submit("schedule", schedule_id, streamed, solver_kwargs)
+
+
+def submit_year_auto_assign(academic_year, streamed=True, **solver_kwargs):
+    """
+    Queue the joint auto-assign of every schedule in an academic year (year_solver_main).
+    Same job lifecycle, return value and JobConflict rule as submit_auto_assign; while it runs no
+    per-schedule job can start, and it cannot start while one is running.
+    """
+    return _submit("academic_year", academic_year, streamed, solver_kwargs)
+
+
+def run_auto_assign(schedule_id, stats, **solver_kwargs):
+    """
+    Run auto-assign as a job and wait for it (the synchronous route uses this so the solve still
+    happens in a solver worker). Nothing streams this job's progress, so its solve may decompose.
+    Fills stats with the job's solver stats and returns the assigned map. Raises RuntimeError if the job failed
+    and JobConflict if another job is writing the schedule with different options.
+    """
+    job, attached = submit_auto_assign(schedule_id, streamed=False, **solver_kwargs)
+    job["done"].wait()
+    stats.update(job["solver_stats"])
+    if job["status"] == "failed":
+        raise RuntimeError(job["error"])
+    return job["assigned_map"]
+
+
+def get_job_status(job_id):
+    """Return a JSON-safe snapshot of a job, or None if the job id is unknown."""
+    job = _jobs.get(job_id)
+    if not job:
+        return None
+
+    stats = job["solver_stats"]
+    if job["started_at"]:
+        elapsed = (job["finished_at"] or time.time()) - job["started_at"]
+    else:
+        elapsed = 0
+
+    return {
+        "job_id": job["job_id"],
+        "schedule_id": job["schedule_id"],
+        "academic_year": job["academic_year"],
+        "status": job["status"],
+        "phase": stats.get("phase"),
+        "best_objective": stats.get("best_objective"),
+        "best_bound": stats.get("best_bound"),
+        "solutions_found": len(stats.get("solutions") or []),
+        "elapsed_seconds": round(elapsed, 2),
+        "incumbent": stats.get("incumbent"),
+        "assigned_map": job["assigned_map"],
+        "solver_stats": dict(stats) if job["finished_at"] else None,
+        "error": job["error"],
+    }
+
+
+def accept_incumbent(job_id):
+    """
+    Ask a running job to stop at its current best solution.
+    The solve stops within a fraction of a second and saves that incumbent as the result.
+    Returns the job status snapshot, or None if the job id is unknown.
+    """
+    job = _jobs.get(job_id)
+    if not job:
+        return None
+
+    if not job["finished_at"]:
+        print(f"[AUTO ASSIGN JOB] Incumbent accepted for job {job_id}")
+        job["solver_stats"]["stop_requested"] = True
+        if SOLVER_WORKER_PROCESSES > 0:
+            request_stop(job_id)
+
+    return get_job_status(job_id)
+
+
+def iter_job_events(job_id, poll_seconds=0.5):
+    """
+    Yield Server-Sent Events for a job: a "phase" event whenever the phase changes,
+    a "solution" event for every improving solution, and a final "done" event with the result.
+    """
+    job = _jobs.get(job_id)
+    if not job:
+        return
+
+    sent_solutions = 0
+    last_phase = None
+
+    while True:
+        stats = job["solver_stats"]
+
+        phase = stats.get("phase")
+        if phase != last_phase:
+            last_phase = phase
+            yield f"event: phase\ndata: {json.dumps({'phase': phase})}\n\n"
+
+        solutions = stats.get("solutions") or []
+        for event in solutions[sent_solutions:]:
+            yield f"event: solution\ndata: {json.dumps(event)}\n\n"
+        sent_solutions = len(solutions)
+
+        if job["finished_at"]:
+            yield f"event: done\ndata: {json.dumps(get_job_status(job_id))}\n\n"
+            return
+
+        time.sleep(poll_seconds)
@@ -0,0 +1,194 @@
+# Long-lived solver worker processes.
+# Each worker imports scheduling (OR-Tools, the Supabase client) once when it starts and then runs
+# solver_main / year_solver_main jobs from a shared local queue, so a solve neither pays that start-up
+# cost again nor competes with request handling for the Flask process's GIL. A worker that crashes or
+# hits its memory limit only fails its own job and is replaced.
+import atexit
+import multiprocessing
+import os
+import queue
+import threading
+import time
+import traceback
+
+from reference_cache import reference_generation
+
+SOLVER_WORKER_PROCESSES = int(os.getenv("SOLVER_WORKER_PROCESSES", "2"))  # 0 = solve on threads in the Flask process
+SOLVER_WORKER_MEMORY_MB = int(os.getenv("SOLVER_WORKER_MEMORY_MB", "0"))  # address-space limit per worker, 0 = none
+PROGRESS_INTERVAL_SECONDS = 0.5  # how often a running job sends its stats back
+
+_ctx = multiprocessing.get_context("spawn")
+_lock = threading.Lock()
+_tasks = None      # parent -> any idle worker: (job_id, target, target_id, solver_kwargs, streamed, reference generation) or None to stop
+_events = None     # workers -> parent: (kind, job_id, payload)
+_workers = []      # [{"process", "control", "job_id"}]
+_callbacks = {}    # job_id -> on_event(kind, payload)
+_stopping = False
+
+
+# ------------------------------------------------------------
+# Worker side
+# ------------------------------------------------------------
+def _snapshot(stats):
+    # copy the lists the solver keeps appending to, so the queue pickles a consistent view
+    return {key: list(value) if isinstance(value, list) else value for key, value in list(stats.items())}
+
+
+def _report_progress(job_id, stats, events, control, done):
+    # Runs next to the solve: sends stats snapshots and turns a stop request into the
+    # stop_requested flag the running solve watches for
+    while not done.wait(PROGRESS_INTERVAL_SECONDS):
+        try:
+            while True:
+                kind, target = control.get_nowait()
+                if kind == "stop" and target == job_id:
+                    stats["stop_requested"] = True
+        except queue.Empty:
+            pass
+        events.put(("progress", job_id, _snapshot(stats)))
+
+
+def _worker_main(index, tasks, events, control, memory_mb):
+    if memory_mb:
+        try:
+            import resource
+            limit = memory_mb * 1024 * 1024
+            resource.setrlimit(resource.RLIMIT_AS, (limit, limit))
+        except (ImportError, ValueError, OSError) as e:
+            print(f"[SOLVER WORKER {index}] Could not set memory limit: {e}")
+
+    # the expensive imports happen once per worker, not once per solve
+    from artifacts.schedulingprototype.scheduling import solver_main, year_solver_main
+    from reference_cache import sync_reference_generation
+    print(f"[SOLVER WORKER {index}] Ready (pid {os.getpid()})")
+
+    while True:
+        task = tasks.get()
+        if task is None:
+            break
+
+        job_id, target, target_id, solver_kwargs, streamed, generation = task
+        solve = solver_main if target == "schedule" else year_solver_main
+        # drop cached reference rows if the Flask process invalidated them since the last job
+        sync_reference_generation(generation)
+        events.put(("started", job_id, index))
+        stats = {"phase": "starting", "streamed": streamed}
+        done = threading.Event()
+        reporter = threading.Thread(target=_report_progress, args=(job_id, stats, events, control, done), daemon=True)
+        reporter.start()
+
+        try:
+            result = solve(target_id, stats=stats, **solver_kwargs)
+            outcome = ("completed", {"assigned_map": result, "solver_stats": _snapshot(stats)})
+        except MemoryError:
+            outcome = ("failed", {"error": f"Solver ran out of memory (limit {memory_mb} MB)", "solver_stats": _snapshot(stats)})
+        except Exception as e:
+            print(traceback.format_exc())
+            outcome = ("failed", {"error": str(e), "solver_stats": _snapshot(stats)})
+
+        done.set()
+        reporter.join()
+        events.put((outcome[0], job_id, outcome[1]))
+
+
+# ------------------------------------------------------------
+# Parent side
+# ------------------------------------------------------------
+def _start_worker(index):
+    control = _ctx.Queue()
+    # not a daemon: component and scenario solves start their own process pools inside the worker
+    process = _ctx.Process(
+        target=_worker_main,
+        args=(index, _tasks, _events, control, SOLVER_WORKER_MEMORY_MB),
+        name=f"solver-worker-{index}",
+    )
+    process.start()
+    return {"process": process, "control": control, "job_id": None}
+
+
+def _ensure_pool():
+    global _tasks, _events
+    with _lock:
+        if _workers:
+            return
+        _tasks = _ctx.Queue()
+        _events = _ctx.Queue()
+        for index in range(SOLVER_WORKER_PROCESSES):
+            _workers.append(_start_worker(index))
+        threading.Thread(target=_listen, name="solver-worker-listener", daemon=True).start()
+        atexit.register(shutdown_workers)
+        print(f"[SOLVER WORKERS] Started {SOLVER_WORKER_PROCESSES} worker process(es)")
+
+
+def _dispatch(kind, job_id, payload):
+    callback = _callbacks.get(job_id)
+    if kind in ("completed", "failed"):
+        _callbacks.pop(job_id, None)
+    if callback:
+        callback(kind, payload)
+
+
+def _listen():
+    # Routes worker events to the job callbacks and replaces workers that died mid-job
+    while True:
+        try:
+            kind, job_id, payload = _events.get(timeout=1)
+        except queue.Empty:
+            kind = None
+
+        if kind == "started":
+            _workers[payload]["job_id"] = job_id
+        elif kind in ("completed", "failed"):
+            for worker in _workers:
+                if worker["job_id"] == job_id:
+                    worker["job_id"] = None
+        if kind:
+            _dispatch(kind, job_id, payload)
+
+        for index, worker in enumerate(_workers):
+            if _stopping or worker["process"].is_alive():
+                continue
+            exitcode = worker["process"].exitcode
+            print(f"[SOLVER WORKERS] Worker {index} exited with code {exitcode} — restarting")
+            if worker["job_id"]:
+                _dispatch("failed", worker["job_id"], {"error": f"Solver worker exited with code {exitcode}", "solver_stats": {}})
+            _workers[index] = _start_worker(index)
+
+
+def submit_to_worker(job_id, target, target_id, solver_kwargs, on_event, streamed=True):
+    """
+    Queue a solve on the worker pool: solver_main(target_id) for target "schedule",
+    year_solver_main(target_id) for target "academic_year".
+    on_event(kind, payload) is called from the listener thread with "started", "progress"
+    (a solver stats snapshot), and finally "completed" ({assigned_map, solver_stats})
+    or "failed" ({error, solver_stats}). streamed is passed on to the solve's stats (see solve_sections).
+    """
+    _ensure_pool()
+    _callbacks[job_id] = on_event
+    _tasks.put((job_id, target, target_id, solver_kwargs, streamed, reference_generation()))
+
+
+def request_stop(job_id):
+    """Ask the worker running job_id to stop at its current incumbent."""
+    for worker in _workers:
+        if worker["job_id"] == job_id:
+            worker["control"].put(("stop", job_id))
+            return True
+    return False
+
+
+def shutdown_workers(timeout=5):
+    """Stop the pool: idle workers exit on their sentinel, anything still busy after timeout is terminated."""
+    global _stopping
+    with _lock:
+        if not _workers:
+            return
+        _stopping = True
+        for _ in _workers:
+            _tasks.put(None)
+        deadline = time.time() + timeout
+        for worker in _workers:
+            worker["process"].join(max(0, deadline - time.time()))
+            if worker["process"].is_alive():
+                worker["process"].terminate()
+        _workers.clear()
@@ -31,6 +31,8 @@ import requests
 
 from io import BytesIO
 
+from reference_cache import invalidate_reference
+
 
 load_dotenv() 
 # this function will load the variables from the .env file
@@ -536,6 +538,9 @@ def save_uploaded_file(file, user_email, supabase, table_name, bucket_name="uplo
     except Exception as e:
         print("Error inside save_uploaded_file():", e)
         raise
+    finally:
+        # the table was cleared and reloaded (and courses relinked to programs), even if a later step failed
+        invalidate_reference()
 
 # created with help of AI - needed help understanding why filter was needed
 def clear_table_data(table_name):
@@ -596,11 +601,28 @@ def upload_table(file, table_name, uploaded_by):
     
         
     column_standardization = TABLE_COLUMN_MAPPINGS[table_name]
-    upload_file(file, table_name, column_standardization, uploaded_by)
+    try:
+        upload_file(file, table_name, column_standardization, uploaded_by)
+    finally:
+        invalidate_reference(table_name)
 
     print(f"Data successfully uploaded to table: {table_name}")
 
 
+# PostgREST returns at most its max-rows setting (1000 by default) per request and silently drops the rest
+PAGE_SIZE = 1000
+
+# function to read every row of a query, one range() page at a time
+# build_query is called once per page and must return a fresh query with a deterministic order
+def fetch_all_rows(build_query, page_size=PAGE_SIZE):
+    rows = []
+    while True:
+        page = build_query().range(len(rows), len(rows) + page_size - 1).execute().data or []
+        rows.extend(page)
+        if len(page) < page_size:
+            return rows
+
+
 # function to get the table data from the database
 def fetch_table_data (table_name):
     if table_name not in TABLE_COLUMN_MAPPINGS:
@@ -644,6 +666,7 @@ def restore_file_from_url(file_url, table_name, uploaded_by):
     file_like = BytesIO(response.content)
     file_like.filename = file_url.split("/")[-1] # gives the filename an attribute
 
+    # upload_table invalidates the cached reference rows for this table
     upload_table(file_like, table_name, uploaded_by)
 
 def get_user_info(id):
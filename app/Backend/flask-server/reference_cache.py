@@ -0,0 +1,105 @@
+# In-process read-through cache for the reference tables (courses, instructors, programs).
+# These tables only change when an admin uploads a file (or a schedule save rewrites instructor CCH),
+# so the read endpoints serve them from memory. Every write path calls invalidate_reference(), and the
+# TTL bounds how stale an entry can get if something changes the tables outside this app.
+import copy
+import os
+import threading
+import time
+from collections import OrderedDict
+
+REFERENCE_CACHE_ENABLED = os.getenv("REFERENCE_CACHE_ENABLED", "true").lower() == "true"
+REFERENCE_CACHE_TTL_SECONDS = float(os.getenv("REFERENCE_CACHE_TTL_SECONDS", "300"))
+REFERENCE_CACHE_MAX_ENTRIES = int(os.getenv("REFERENCE_CACHE_MAX_ENTRIES", "64"))
+
+# only these tables are cached; their writes all go through the invalidation hooks
+REFERENCE_TABLES = ("courses", "instructors", "programs")
+
+_lock = threading.Lock()
+_entries = OrderedDict()  # (table, query_key) -> (stored_at, rows), least recently used first
+_counters = {"hits": 0, "misses": 0, "expired": 0, "evictions": 0, "invalidations": 0}
+_generation = 0  # bumped on every invalidation; solver worker processes compare it to drop their own copies
+
+
+def get_reference(table, query_key, fetch):
+    """
+    Return the rows for one reference-table query, calling fetch() only on a miss or an expired entry.
+    query_key identifies the query within the table (e.g. "all" or "active"); callers get their own
+    copy of the rows, so mutating them does not change what the next caller sees.
+    """
+    if table not in REFERENCE_TABLES:
+        raise ValueError(f"Not a cached reference table: {table}")
+    if not REFERENCE_CACHE_ENABLED:
+        return fetch()
+
+    key = (table, query_key)
+    with _lock:
+        entry = _entries.get(key)
+        if entry and time.monotonic() - entry[0] < REFERENCE_CACHE_TTL_SECONDS:
+            _entries.move_to_end(key)
+            _counters["hits"] += 1
+            return copy.deepcopy(entry[1])
+        if entry:
+            del _entries[key]
+            _counters["expired"] += 1
+        _counters["misses"] += 1
+        generation = _generation
+
+    # fetch outside the lock so a slow query does not block hits on other tables
+    rows = fetch()
+
+    with _lock:
+        # an invalidation that happened while fetching means these rows may already be stale
+        if generation == _generation:
+            _entries[key] = (time.monotonic(), copy.deepcopy(rows))
+            _entries.move_to_end(key)
+            while len(_entries) > REFERENCE_CACHE_MAX_ENTRIES:
+                _entries.popitem(last=False)
+                _counters["evictions"] += 1
+    return rows
+
+
+def invalidate_reference(table=None):
+    """Drop cached queries for one table, or for every table when table is None."""
+    global _generation
+    if table is not None and table not in REFERENCE_TABLES:
+        raise ValueError(f"Not a cached reference table: {table}")
+    with _lock:
+        for key in [k for k in _entries if table is None or k[0] == table]:
+            del _entries[key]
+        _generation += 1
+        _counters["invalidations"] += 1
+    print(f"[REFERENCE CACHE] Invalidated {table or 'all tables'}")
+
+
+def reference_generation():
+    return _generation
+
+
+def sync_reference_generation(generation):
+    # Called in a solver worker process with the parent's generation: an invalidation there
+    # means this process's copies are out of date too
+    global _generation
+    with _lock:
+        if generation == _generation:
+            return
+        _entries.clear()
+        _generation = generation
+
+
+def reference_cache_stats():
+    """Hit/miss counters plus the current entries and their ages."""
+    with _lock:
+        now = time.monotonic()
+        lookups = _counters["hits"] + _counters["misses"]
+        return {
+            "enabled": REFERENCE_CACHE_ENABLED,
+            "ttl_seconds": REFERENCE_CACHE_TTL_SECONDS,
+            "max_entries": REFERENCE_CACHE_MAX_ENTRIES,
+            **_counters,
+            "hit_rate": round(_counters["hits"] / lookups, 3) if lookups else None,
+            "entries": [
+                {"table": table, "query": query_key, "rows": len(rows), "age_seconds": round(now - stored_at, 1)}
+                for (table, query_key), (stored_at, rows) in _entries.items()
+            ],
+        }
@@ -0,0 +1,24 @@
+-- Per-program course and section counts for one academic year, used by /api/academic-year-summary.
+-- Counting in the database keeps that endpoint from streaming every course and section row to Flask.
+CREATE OR REPLACE FUNCTION public.academic_year_program_counts(p_academic_year integer)
+RETURNS TABLE(program_id text, total_courses bigint, actual_sections bigint)
+LANGUAGE sql STABLE
+AS $$
+  SELECT
+    c.program_id,
+    COUNT(DISTINCT c.course_id) AS total_courses,
+    COUNT(sec.id) AS actual_sections
+  FROM public.courses c
+  LEFT JOIN (
+    SELECT s.id, s.course_id
+    FROM public.sections s
+    JOIN public.schedules sch ON sch.id = s.schedule_id
+    WHERE sch.academic_year = p_academic_year
+  ) sec ON sec.course_id = c.course_id
+  WHERE c.program_id IS NOT NULL
+  GROUP BY c.program_id;
+$$;
+
+GRANT ALL ON FUNCTION public.academic_year_program_counts(integer) TO anon;
+GRANT ALL ON FUNCTION public.academic_year_program_counts(integer) TO authenticated;
+GRANT ALL ON FUNCTION public.academic_year_program_counts(integer) TO service_role;
@@ -67,6 +67,28 @@ $$;
 
 ALTER FUNCTION "public"."get_user_by_email"("user_email" "text") OWNER TO "postgres";
 
+
+CREATE OR REPLACE FUNCTION "public"."academic_year_program_counts"("p_academic_year" integer) RETURNS TABLE("program_id" "text", "total_courses" bigint, "actual_sections" bigint)
+    LANGUAGE "sql" STABLE
+    AS $$
+  SELECT
+    c.program_id,
+    COUNT(DISTINCT c.course_id) AS total_courses,
+    COUNT(sec.id) AS actual_sections
+  FROM public.courses c
+  LEFT JOIN (
+    SELECT s.id, s.course_id
+    FROM public.sections s
+    JOIN public.schedules sch ON sch.id = s.schedule_id
+    WHERE sch.academic_year = p_academic_year
+  ) sec ON sec.course_id = c.course_id
+  WHERE c.program_id IS NOT NULL
+  GROUP BY c.program_id;
+$$;
+
+
+ALTER FUNCTION "public"."academic_year_program_counts"("p_academic_year" integer) OWNER TO "postgres";
+
 SET default_tablespace = '';
 
 SET default_table_access_method = "heap";
@@ -1204,6 +1226,11 @@ GRANT ALL ON FUNCTION "public"."get_user_by_email"("user_email" "text") TO "auth
 GRANT ALL ON FUNCTION "public"."get_user_by_email"("user_email" "text") TO "service_role";
 
 
+GRANT ALL ON FUNCTION "public"."academic_year_program_counts"("p_academic_year" integer) TO "anon";
+GRANT ALL ON FUNCTION "public"."academic_year_program_counts"("p_academic_year" integer) TO "authenticated";
+GRANT ALL ON FUNCTION "public"."academic_year_program_counts"("p_academic_year" integer) TO "service_role";
+
+
 
 
 